@@ -0,0 +1,66 @@
+import json
+from dataclasses import dataclass, field
+from os import getenv
+
+import homework
+from homework import auth_headers
+
+ACCOUNTS_FILE = getenv('ACCOUNTS_FILE')
+
+
+@dataclass(frozen=True)
+class Account:
+    """Аккаунт студента: токен API-сервиса и чат для уведомлений."""
+
+    name: str
+    token: str = field(repr=False)
+    chat_id: str
+
+    @property
+    def headers(self):
+        """Заголовки авторизации для запросов от имени аккаунта."""
+        return auth_headers(self.token)
+
+
+def load_accounts(path):
+    """Читает список аккаунтов из json-файла."""
+    with open(path, encoding='utf-8') as file:
+        entries = json.load(file)
+
+    if not isinstance(entries, list):
+        raise TypeError('Файл аккаунтов должен содержать список')
+
+    accounts = []
+    for number, entry in enumerate(entries):
+        try:
+            accounts.append(Account(
+                name=str(entry.get('name') or number),
+                token=entry['practicum_token'],
+                chat_id=str(entry['chat_id']),
+            ))
+        except KeyError as error:
+            raise KeyError(
+                f'Аккаунт №{number} не содержит ключа {error}'
+            )
+
+    names = [account.name for account in accounts]
+    if len(set(names)) != len(names):
+        raise ValueError('Имена аккаунтов должны быть уникальными')
+
+    return accounts
+
+
+def default_accounts():
+    """Аккаунт из переменных окружения для запуска без файла аккаунтов."""
+    return [Account(
+        name='default',
+        token=homework.PRACTICUM_TOKEN,
+        chat_id=homework.TELEGRAM_CHAT_ID,
+    )]
+
+
+def configured_accounts():
+    """Аккаунты из ACCOUNTS_FILE, а без него — из переменных окружения."""
+    if ACCOUNTS_FILE:
+        return load_accounts(ACCOUNTS_FILE)
+    return default_accounts()
@@ -0,0 +1,99 @@
+import re
+import time
+from os import getenv
+
+ALERT_WINDOW = float(getenv('ALERT_WINDOW', 30 * 60))
+DIGEST_INTERVAL = float(getenv('ALERT_DIGEST_INTERVAL', 60 * 60))
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+VOLATILE = (
+    (re.compile(r'0x[0-9a-fA-F]+'), '0x?'),
+    (re.compile(r'[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}'), '?'),
+    (re.compile(r'\d+(\.\d+)?'), 'N'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def normalize(message):
+    """Убирает из текста ошибки числа, адреса и идентификаторы."""
+    for pattern, replacement in VOLATILE:
+        message = pattern.sub(replacement, message)
+    return message.strip()
+
+
+def format_time(timestamp):
+    """Время в формате TIME_FORMAT по местному часовому поясу."""
+    return time.strftime(TIME_FORMAT, time.localtime(timestamp))
+
+
+def fingerprint(error):
+    """Отпечаток ошибки: тип исключения и нормализованный текст."""
+    return type(error).__name__, normalize(str(error))
+
+
+class Alert:
+    """Сведения об ошибке с одним отпечатком."""
+
+    __slots__ = ('message', 'first_seen', 'last_seen', 'sent_at',
+                 'suppressed')
+
+    def __init__(self, message, now):
+        self.message = message
+        self.first_seen = now
+        self.last_seen = now
+        self.sent_at = None
+        self.suppressed = 0
+
+
+class ErrorDigest:
+    """Подавляет повторы ошибок и собирает их в периодическую сводку.
+
+    Первое появление ошибки отправляется сразу. Ошибки с тем же
+    отпечатком в течение window секунд только подсчитываются и раз в
+    digest_interval секунд попадают в сводку.
+    """
+
+    def __init__(self, window=ALERT_WINDOW, digest_interval=DIGEST_INTERVAL,
+                 clock=time.time):
+        self.window = window
+        self.digest_interval = digest_interval
+        self.clock = clock
+        self.alerts = {}
+        self.digest_at = clock() + digest_interval
+
+    def record(self, error, message):
+        """Учитывает ошибку; возвращает True, если о ней надо сообщить."""
+        now = self.clock()
+        key = fingerprint(error)
+        alert = self.alerts.get(key)
+        if alert is None:
+            alert = self.alerts[key] = Alert(message, now)
+        alert.last_seen = now
+        alert.message = message
+        if alert.sent_at is not None and now - alert.sent_at < self.window:
+            alert.suppressed += 1
+            return False
+        alert.sent_at = now
+        return True
+
+    def digest(self):
+        """Текст сводки подавленных ошибок, если пришло ее время."""
+        now = self.clock()
+        if now < self.digest_at:
+            return None
+        self.digest_at = now + self.digest_interval
+
+        lines = []
+        for key, alert in list(self.alerts.items()):
+            if alert.suppressed:
+                lines.append(
+                    f'{alert.message} — повторов: {alert.suppressed}, '
+                    f'впервые: {format_time(alert.first_seen)}, '
+                    f'последний раз: {format_time(alert.last_seen)}'
+                )
+                alert.suppressed = 0
+            elif now - alert.last_seen >= self.window:
+                del self.alerts[key]
+        if not lines:
+            return None
+        return 'Сводка повторяющихся ошибок:\n' + '\n'.join(lines)
@@ -0,0 +1,266 @@
+import argparse
+import json
+import math
+import time
+from os import getenv
+
+import homework
+from accounts import configured_accounts
+from bot_api import create_bot
+from state import homework_key, updated_at
+from storage import STATE_DB, StateStore
+
+BUCKET_BASE = 60
+BUCKET_RATIO = 1.25
+BUCKETS = 64
+QUANTILES = (0.5, 0.9, 0.95)
+VERDICTS = ('approved', 'rejected')
+TOP_REJECTED = 5
+SNAPSHOT_INTERVAL = float(getenv('ANALYTICS_SNAPSHOT_INTERVAL', 300))
+
+
+def format_duration(seconds):
+    """Длительность в днях, часах и минутах."""
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    parts = [
+        f'{value} {unit}'
+        for value, unit in ((days, 'д'), (hours, 'ч'), (minutes, 'мин'))
+        if value
+    ]
+    return ' '.join(parts[:2]) or 'меньше минуты'
+
+
+class DurationHistogram:
+    """Гистограмма длительностей с геометрическими корзинами.
+
+    Добавление и оценка перцентиля не зависят от числа наблюдений;
+    погрешность перцентиля — не больше шага корзины BUCKET_RATIO.
+    """
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self, counts=None, count=0, total=0):
+        self.counts = counts or [0] * BUCKETS
+        self.count = count
+        self.total = total
+
+    @staticmethod
+    def bucket(seconds):
+        """Номер корзины для длительности."""
+        if seconds <= BUCKET_BASE:
+            return 0
+        index = math.ceil(math.log(seconds / BUCKET_BASE, BUCKET_RATIO))
+        return min(index, BUCKETS - 1)
+
+    def add(self, seconds):
+        """Учитывает одну длительность."""
+        self.counts[self.bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        """Верхняя граница корзины, в которую попадает перцентиль q."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return BUCKET_BASE * BUCKET_RATIO ** index
+        return BUCKET_BASE * BUCKET_RATIO ** (BUCKETS - 1)
+
+    def mean(self):
+        """Среднее значение или None без наблюдений."""
+        return self.total / self.count if self.count else None
+
+
+class ReviewStats:
+    """Итоги проверок: вердикты и время на проверке."""
+
+    __slots__ = ('approved', 'rejected', 'durations')
+
+    def __init__(self, approved=0, rejected=0, durations=None):
+        self.approved = approved
+        self.rejected = rejected
+        self.durations = durations or DurationHistogram()
+
+    def to_dict(self):
+        """Представление для сохранения в json."""
+        return {
+            'approved': self.approved,
+            'rejected': self.rejected,
+            'counts': self.durations.counts,
+            'count': self.durations.count,
+            'total': self.durations.total,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Восстанавливает итоги из to_dict."""
+        return cls(data['approved'], data['rejected'], DurationHistogram(
+            data['counts'], data['count'], data['total']
+        ))
+
+
+def groups(homework):
+    """Группы статистики, к которым относится работа."""
+    yield 'all'
+    if homework.get('lesson_name'):
+        yield f'project:{homework["lesson_name"]}'
+
+
+class Analytics:
+    """Статистика проверок, обновляемая на каждом переходе статуса.
+
+    Обработка перехода занимает O(1): обновляются счетчики и
+    гистограммы групп работы, история не пересматривается.
+    """
+
+    def __init__(self, review_started=None, rejections=None, stats=None):
+        self.review_started = review_started or {}
+        self.rejections = rejections or {}
+        self.stats = stats or {}
+        self.dirty = False
+        self.saved_at = None
+
+    def record(self, homework, previous=None, now=None):
+        """Учитывает переход работы из статуса previous."""
+        status = homework.get('status')
+        key = homework_key(homework)
+        at = updated_at(homework) or now or time.time()
+        if status == 'reviewing':
+            self.review_started[key] = at
+            self.dirty = True
+            return
+        if status not in VERDICTS:
+            return
+
+        started = self.review_started.pop(key, None)
+        duration = None
+        if previous == 'reviewing' and started is not None:
+            duration = max(0, at - started)
+        for group in groups(homework):
+            stats = self.stats.setdefault(group, ReviewStats())
+            setattr(stats, status, getattr(stats, status) + 1)
+            if duration is not None:
+                stats.durations.add(duration)
+        if status == 'rejected':
+            name = homework.get('homework_name') or key
+            self.rejections[name] = self.rejections.get(name, 0) + 1
+        self.dirty = True
+
+    def snapshot(self, now, interval=SNAPSHOT_INTERVAL):
+        """Снимок для хранилища не чаще раза в interval секунд.
+
+        Возвращает None, если статистика не менялась или с прошлого
+        снимка прошло меньше interval секунд.
+        """
+        if not self.dirty or (
+            self.saved_at is not None and now - self.saved_at < interval
+        ):
+            return None
+        self.dirty = False
+        self.saved_at = now
+        return self.to_json()
+
+    def to_json(self):
+        """Снимок статистики для хранилища."""
+        return json.dumps({
+            'review_started': self.review_started,
+            'rejections': self.rejections,
+            'stats': {
+                group: stats.to_dict() for group, stats in self.stats.items()
+            },
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, data):
+        """Восстанавливает статистику из to_json."""
+        if not data:
+            return cls()
+        data = json.loads(data)
+        return cls(
+            data['review_started'],
+            data['rejections'],
+            {
+                group: ReviewStats.from_dict(stats)
+                for group, stats in data['stats'].items()
+            },
+        )
+
+    def summary(self):
+        """Сводка статистики для чата и командной строки."""
+        total = self.stats.get('all')
+        if total is None:
+            return 'Проверенных работ пока нет.'
+        lines = [
+            'Статистика проверок',
+            f'Проверено: {total.approved + total.rejected} '
+            f'(принято {total.approved}, с замечаниями {total.rejected})',
+        ]
+        lines.extend(self._durations('Время проверки', total))
+        prefix = 'project:'
+        project_lines = []
+        for group, stats in sorted(self.stats.items()):
+            if group.startswith(prefix):
+                project_lines.extend(self._durations(
+                    f'  {group[len(prefix):]}: '
+                    f'{stats.approved + stats.rejected} проверок',
+                    stats
+                ))
+        if project_lines:
+            lines.append('Проекты:')
+            lines.extend(project_lines)
+        rejected = sorted(
+            self.rejections.items(), key=lambda item: -item[1]
+        )[:TOP_REJECTED]
+        if rejected:
+            lines.append('Больше всего замечаний:')
+            lines.extend(f'  {name}: {count}' for name, count in rejected)
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _durations(title, stats):
+        durations = stats.durations
+        if not durations.count:
+            return [title]
+        quantiles = ', '.join(
+            f'p{int(q * 100)} {format_duration(durations.quantile(q))}'
+            for q in QUANTILES
+        )
+        return [
+            f'{title}, {quantiles}, '
+            f'среднее {format_duration(durations.mean())}'
+        ]
+
+
+def main():
+    """Отчет по проверкам работ для аккаунтов бота."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        '--send', action='store_true',
+        help='отправить сводку в чат каждого аккаунта'
+    )
+    args = parser.parse_args()
+
+    accounts = configured_accounts()
+    bot = create_bot(homework.TELEGRAM_TOKEN) if args.send else None
+
+    store = StateStore(STATE_DB)
+    try:
+        for account in accounts:
+            summary = Analytics.from_json(
+                store.load_analytics(account.name)
+            ).summary()
+            print(f'[{account.name}]\n{summary}\n')
+            if bot:
+                homework.send_to_chat(bot, account.chat_id, summary)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
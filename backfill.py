@@ -0,0 +1,143 @@
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from os import getenv
+
+from accounts import configured_accounts
+from decoding import HomeworkStream
+from exceptions import RateLimitedError, ThrottledError
+from hedging import API_DEADLINE
+from homework import check_response, fetch_statuses
+from logging_setup import configure_logging
+from quota import QuotaManager
+from state import homework_key, intern_status, updated_at
+from storage import STATE_DB, StateStore
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_SINCE = int(getenv('BACKFILL_SINCE', 1546300800))
+BACKFILL_BATCH = int(getenv('BACKFILL_BATCH', 500))
+BACKFILL_WORKERS = int(getenv('BACKFILL_WORKERS', 8))
+BACKFILL_ATTEMPTS = int(getenv('BACKFILL_ATTEMPTS', 5))
+
+
+def request_history(account, since, quota):
+    """Ответ API-сервиса с историей аккаунта в пределах бюджетов quota.
+
+    Перед запросом ждет, пока quota разрешит запрос токена; ответ 429
+    приостанавливает запросы на Retry-After секунд, после чего запрос
+    повторяется, всего не больше BACKFILL_ATTEMPTS раз.
+    """
+    for attempt in range(1, BACKFILL_ATTEMPTS + 1):
+        while True:
+            try:
+                quota.acquire(account.token)
+                break
+            except ThrottledError as error:
+                time.sleep(error.retry_in)
+        try:
+            return fetch_statuses(
+                account.headers, {'from_date': since}, API_DEADLINE,
+                stream=True
+            )
+        except RateLimitedError as error:
+            quota.throttle(account.token, error.retry_after)
+            if attempt == BACKFILL_ATTEMPTS:
+                raise
+
+
+def fetch_history(account, store, since, batch=BACKFILL_BATCH, quota=None):
+    """Загружает в store статусы работ аккаунта, изменившихся с since.
+
+    API-сервис принимает только нижнюю границу from_date, поэтому вся
+    история запрашивается одним запросом: окна с общей нижней границей
+    заново передавали бы все более поздние работы. Ответ разбирается
+    потоком, статусы пишутся в store пачками по batch работ. Если
+    работа встретилась в ответе несколько раз, сохраняется самое
+    позднее изменение. Возвращает current_date и число работ.
+    """
+    response = request_history(account, since, quota or QuotaManager())
+    latest = {}
+    statuses = {}
+    with closing(response):
+        stream = HomeworkStream.from_response(response)
+        for homework in stream:
+            key = homework_key(homework)
+            if key is None:
+                continue
+            updated = updated_at(homework) or 0
+            if latest.get(key, -1) >= updated:
+                continue
+            latest[key] = updated
+            statuses[key] = intern_status(homework.get('status'))
+            if len(statuses) >= batch:
+                store.save(account.name, statuses=statuses)
+                statuses = {}
+    check_response(stream.fields)
+    store.save(account.name, statuses=statuses)
+    return int(stream.fields['current_date']), len(latest)
+
+
+def backfill(accounts, store, since=BACKFILL_SINCE, batch=BACKFILL_BATCH,
+             workers=BACKFILL_WORKERS, quota=None):
+    """Загружает историю статусов аккаунтов с момента since в хранилище.
+
+    Аккаунты загружаются параллельно пулом из workers потоков; все
+    запросы списываются из бюджетов quota. По умолчанию паузы после
+    ответа 429 берутся из store и общие с работающим ботом, а бюджеты
+    запросов у загрузки свои.
+    Курсор from_date ставится только аккаунтам, у которых его не было.
+    Возвращает число аккаунтов, историю которых загрузить не удалось.
+    """
+    quota = quota or QuotaManager(store=store)
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                fetch_history, account, store, since, batch, quota
+            ): account
+            for account in accounts
+        }
+        for future in as_completed(futures):
+            account = futures[future]
+            try:
+                current_date, loaded = future.result()
+            except Exception as error:
+                failed += 1
+                logger.error(
+                    '[%s] История не загружена: %s', account.name, error
+                )
+                continue
+            stored_timestamp, _ = store.load(account.name)
+            if stored_timestamp is None:
+                store.save(account.name, current_date)
+            logger.info('[%s] Загружено работ: %s', account.name, loaded)
+    return failed
+
+
+def main():
+    """Загрузка истории статусов для аккаунтов бота."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--since', type=int, default=BACKFILL_SINCE)
+    parser.add_argument('--batch', type=int, default=BACKFILL_BATCH)
+    parser.add_argument('--workers', type=int, default=BACKFILL_WORKERS)
+    args = parser.parse_args()
+
+    accounts = configured_accounts()
+    store = StateStore(STATE_DB)
+    try:
+        failed = backfill(
+            accounts, store, args.since, args.batch, args.workers
+        )
+    finally:
+        store.close()
+    if failed:
+        sys.exit(f'Не загружено аккаунтов: {failed}')
+
+
+if __name__ == '__main__':
+    configure_logging()
+    main()
@@ -0,0 +1,60 @@
+"""Память на одну отслеживаемую домашнюю работу.
+
+Запуск: python benchmarks/bench_memory.py [--homeworks N]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from fake_servers import FakePracticumServer  # noqa: E402
+from state import StatusTable, homework_key  # noqa: E402
+from storage import StateStore  # noqa: E402
+
+
+def retained(build):
+    """Байты, которые остаются занятыми результатом build()."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return used
+
+
+def main(count):
+    homeworks = FakePracticumServer(homeworks=count).homeworks_since(
+        'student', 0
+    )
+    body = json.dumps({'homeworks': homeworks, 'current_date': 0})
+    store = StateStore(':memory:')
+    store.save('student', statuses={
+        homework_key(homework): homework['status'] for homework in homeworks
+    })
+
+    def decoded():
+        return json.loads(body)['homeworks']
+
+    scenarios = (
+        ('ответ API, словари', decoded),
+        ('статусы из базы: строки', lambda: store.load('student')[1]),
+        ('статусы из базы: StatusTable',
+         lambda: StatusTable(store.load('student')[1])),
+    )
+    for name, build in scenarios:
+        used = retained(build)
+        print(f'{name:<30} {used / count:>8.1f} байт на работу')
+    store.close()
+
+
+if __name__ == '__main__':
+    count = 100000
+    if '--homeworks' in sys.argv:
+        count = int(sys.argv[sys.argv.index('--homeworks') + 1])
+    main(count)
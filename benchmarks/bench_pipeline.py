@@ -0,0 +1,159 @@
+"""Бенчмарк цепочки опрос → разбор → уведомление на локальных заглушках.
+
+Запуск: python benchmarks/bench_pipeline.py [--quick]
+"""
+import asyncio
+import statistics
+import sys
+import time
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+import homework  # noqa: E402
+from accounts import Account  # noqa: E402
+from bot_api import BotApiClient  # noqa: E402
+from engine import Context, poll_once  # noqa: E402
+from fake_servers import (FakePracticumServer,  # noqa: E402
+                          FakeTelegramServer)
+from quota import QuotaManager  # noqa: E402
+from sender import MessageQueue  # noqa: E402
+from state import StatusTable  # noqa: E402
+
+
+def make_homeworks(count):
+    """Список из count домашних работ в формате API-сервиса."""
+    return FakePracticumServer(homeworks=count).homeworks_since(
+        'student', 0
+    )
+
+
+def measure(func, repeat):
+    """Запускает func repeat раз и возвращает длительности в секундах."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def report(name, durations, total=None):
+    """Печатает пропускную способность и перцентили задержки."""
+    total = total if total is not None else sum(durations)
+    if len(durations) > 1:
+        cuts = statistics.quantiles(durations, n=100)
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = durations[0]
+    print(
+        f'{name:<40} {len(durations) / total:>10.1f} ops/s'
+        f'  p50 {p50 * 1000:>8.3f} ms'
+        f'  p95 {p95 * 1000:>8.3f} ms'
+        f'  p99 {p99 * 1000:>8.3f} ms'
+    )
+
+
+def swallow(func):
+    """Обертка, подавляющая ошибки, для сценариев со сбоями."""
+    def wrapper():
+        try:
+            func()
+        except Exception:
+            pass
+    return wrapper
+
+
+def bench_get_api_answer(repeat):
+    for name, options in (
+        ('get_api_answer', {}),
+        ('get_api_answer 1000 homeworks', {'homeworks': 1000}),
+        ('get_api_answer slow upstream 50ms', {'latency': 0.05}),
+        ('get_api_answer slow upstream exp:0.05', {'latency': 'exp:0.05'}),
+        ('get_api_answer failed upstream 500', {'error_rate': 1}),
+    ):
+        server = FakePracticumServer(**options).start()
+        homework.ENDPOINT = server.endpoint
+        report(name, measure(
+            swallow(lambda: homework.get_api_answer(1)), repeat
+        ))
+        server.stop()
+
+
+def bench_parse(repeat):
+    for count in (1, 1000, 10000):
+        response = {
+            'homeworks': make_homeworks(count), 'current_date': 0
+        }
+
+        def parse():
+            for item in homework.check_response(response):
+                homework.parse_status(item)
+
+        report(f'check_response+parse_status x{count}', measure(
+            parse, max(1, repeat // max(1, count // 100))
+        ))
+
+
+def bench_send_message(repeat):
+    server = FakeTelegramServer().start()
+    bot = BotApiClient('1234:abcdefg', url=server.url)
+    report('send_to_chat', measure(
+        lambda: homework.send_to_chat(bot, '1', 'text'), repeat
+    ))
+    server.stop()
+
+
+def bench_iterations(accounts_count, repeat, latency=0, homeworks=1):
+    server = FakePracticumServer(homeworks=homeworks, latency=latency).start()
+    telegram = FakeTelegramServer().start()
+    homework.ENDPOINT = server.endpoint
+    queue = MessageQueue(
+        BotApiClient('1234:abcdefg', url=telegram.url), window=0
+    ).start()
+    accounts = [
+        Account(name=str(number), token='token', chat_id=str(number))
+        for number in range(accounts_count)
+    ]
+
+    async def iterate():
+        context = Context(
+            queue=queue, semaphore=asyncio.Semaphore(20),
+            quota=QuotaManager(budget=0, token_budget=0),
+        )
+        durations = []
+
+        async def one(account):
+            table = StatusTable()
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await poll_once(account, context, table, 1)
+                durations.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(account) for account in accounts))
+        return durations, time.perf_counter() - started
+
+    durations, total = asyncio.run(iterate())
+    report(
+        f'iteration x{accounts_count} accounts'
+        + (f' latency {latency * 1000:.0f}ms' if latency else ''),
+        durations, total
+    )
+    queue.close()
+    server.stop()
+    telegram.stop()
+
+
+def main(quick=False):
+    repeat = 20 if quick else 200
+    bench_get_api_answer(repeat)
+    bench_parse(repeat)
+    bench_send_message(repeat)
+    bench_iterations(1, repeat)
+    bench_iterations(100, max(1, repeat // 20))
+    bench_iterations(100, max(1, repeat // 20), latency=0.05)
+
+
+if __name__ == '__main__':
+    main(quick='--quick' in sys.argv)
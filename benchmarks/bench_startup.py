@@ -0,0 +1,64 @@
+"""Время холодного старта и память процесса при импорте бота.
+
+Запуск: python benchmarks/bench_startup.py [--runs N]
+"""
+import json
+import statistics
+import subprocess
+import sys
+import time
+from os.path import abspath, dirname
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+PROBE = '''
+import json, resource, time
+started = time.perf_counter()
+{code}
+imported = time.perf_counter() - started
+print(json.dumps({{
+    'import': imported,
+    'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}}))
+'''
+
+TOKEN = '123456:ABC-DEF1234ghIkl-zyx57W2v1u123ew11'
+
+SCENARIOS = (
+    ('python', 'pass'),
+    ('engine, bot_api', f'import engine; engine.create_bot("{TOKEN}")'),
+    ('engine, python-telegram-bot',
+     f'import engine; engine.create_bot("{TOKEN}", "python-telegram-bot")'),
+)
+
+
+def probe(code):
+    """Запускает новый интерпретатор и возвращает замеры старта."""
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(code=code)],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output)
+    result['total'] = time.perf_counter() - started
+    return result
+
+
+def main(runs):
+    for name, code in SCENARIOS:
+        results = [probe(code) for _ in range(runs)]
+        total = statistics.median(result['total'] for result in results)
+        imported = statistics.median(result['import'] for result in results)
+        rss = statistics.median(result['rss'] for result in results)
+        print(
+            f'{name:<32} start {total * 1000:>7.1f} ms'
+            f'  import {imported * 1000:>7.1f} ms'
+            f'  maxrss {rss / 1024:>6.1f} MiB'
+        )
+
+
+if __name__ == '__main__':
+    runs = 10
+    if '--runs' in sys.argv:
+        runs = int(sys.argv[sys.argv.index('--runs') + 1])
+    main(runs)
@@ -0,0 +1,61 @@
+from os import getenv
+
+from exceptions import RetryAfterError, TelegramApiError
+from http_session import TIMEOUT, get_session
+
+TELEGRAM_API_URL = getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
+TELEGRAM_BACKEND = getenv('TELEGRAM_BACKEND', 'bot_api')
+
+
+class BotApiClient:
+    """Минимальный клиент Bot API: только sendMessage через общую сессию."""
+
+    def __init__(self, token, url=TELEGRAM_API_URL, session=None):
+        self.token = token
+        self.url = f'{url.rstrip("/")}/bot{token}'
+        self.session = session
+
+    def __repr__(self):
+        """Представление без токена, чтобы он не попал в логи."""
+        return f'{type(self).__name__}()'
+
+    def send_message(self, chat_id, text):
+        """Отправляет текст в чат и возвращает отправленное сообщение."""
+        session = self.session or get_session()
+        response = session.post(
+            f'{self.url}/sendMessage',
+            json={'chat_id': chat_id, 'text': text},
+            timeout=TIMEOUT
+        )
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+
+        if data.get('ok'):
+            return data.get('result')
+
+        description = data.get(
+            'description', f'HTTP {response.status_code}'
+        )
+        retry_after = data.get('parameters', {}).get('retry_after')
+        if retry_after is None and response.status_code == 429:
+            retry_after = int(response.headers.get('Retry-After', 1))
+        if retry_after is not None:
+            raise RetryAfterError(description, retry_after)
+        raise TelegramApiError(
+            description, data.get('error_code', response.status_code)
+        )
+
+
+def create_bot(token, backend=TELEGRAM_BACKEND):
+    """Бот для отправки сообщений.
+
+    По умолчанию используется встроенный клиент; python-telegram-bot
+    импортируется только при TELEGRAM_BACKEND=python-telegram-bot.
+    """
+    if backend == 'python-telegram-bot':
+        from telegram import Bot
+
+        return Bot(token=token)
+    return BotApiClient(token)
@@ -0,0 +1,95 @@
+import threading
+import time
+from os import getenv
+
+from exceptions import CircuitOpenError
+
+FAILURE_THRESHOLD = int(getenv('BREAKER_FAILURES', 5))
+PROBE_INTERVAL = float(getenv('BREAKER_PROBE_INTERVAL', 60))
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """Предохранитель для вызовов внешнего сервиса.
+
+    После failure_threshold сбоев подряд размыкается: вызовы сразу
+    отклоняются. Через probe_interval секунд пропускает один пробный
+    вызов; его успех замыкает цепь, сбой снова размыкает.
+    """
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD,
+                 probe_interval=PROBE_INTERVAL, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def retry_in(self):
+        """Через сколько секунд вызов будет разрешен."""
+        with self.lock:
+            if self.state == CLOSED:
+                return 0
+            if self.state == HALF_OPEN:
+                return self.probe_interval if self.probing else 0
+            return max(0, self.opened_at + self.probe_interval - self.clock())
+
+    def allow(self):
+        """Разрешает вызов; в полуоткрытом состоянии — только один."""
+        with self.lock:
+            if self.state == OPEN:
+                if self.clock() < self.opened_at + self.probe_interval:
+                    return False
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self.probing:
+                    return False
+                self.probing = True
+            return True
+
+    def release(self):
+        """Возвращает разрешение, если вызов не состоялся."""
+        with self.lock:
+            self.probing = False
+
+    def success(self):
+        """Отмечает успешный вызов."""
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.probing = False
+
+    def failure(self):
+        """Отмечает сбой вызова."""
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if (self.state == HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+
+def acquire(*breakers):
+    """Получает разрешение у всех предохранителей или ни у одного.
+
+    Если какой-то предохранитель разомкнут, поднимает CircuitOpenError.
+    """
+    allowed = []
+    for breaker in breakers:
+        if not breaker.allow():
+            for other in allowed:
+                other.release()
+            raise CircuitOpenError(
+                f'Цепь {breaker.name} разомкнута, повтор через '
+                f'{breaker.retry_in():.0f} с'
+            )
+        allowed.append(breaker)
@@ -0,0 +1,146 @@
+import codecs
+import importlib
+import json
+import logging
+from os import getenv
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND = getenv('JSON_BACKEND', 'auto')
+BACKENDS = ('orjson', 'ujson', 'json')
+STREAM_CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+def load_backend(name=JSON_BACKEND):
+    """Имя и функция loads быстрейшего доступного бэкенда JSON.
+
+    auto перебирает orjson, ujson и стандартный json; явно указанный,
+    но не установленный бэкенд заменяется стандартным json. Имена не
+    из BACKENDS отклоняются: тело ответа нельзя отдавать произвольному
+    модулю вроде pickle.
+    """
+    if name != 'auto' and name not in BACKENDS:
+        raise ValueError(f'Неизвестный бэкенд JSON: {name}')
+    names = BACKENDS if name == 'auto' else (name, 'json')
+    for candidate in names:
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            logger.debug('Бэкенд JSON %s не установлен', candidate)
+            continue
+        return candidate, module.loads
+    raise ValueError(f'Неизвестный бэкенд JSON: {name}')
+
+
+BACKEND, loads = load_backend()
+
+
+def decode_response(response):
+    """Тело ответа requests, разобранное выбранным бэкендом.
+
+    Объекты без байтового content разбираются их собственным json().
+    """
+    content = getattr(response, 'content', None)
+    if not isinstance(content, bytes):
+        return response.json()
+    return loads(content)
+
+
+class HomeworkStream:
+    """Потоковый разбор ответа API-сервиса.
+
+    Итерация отдает элементы массива homeworks по одному, не держа в
+    памяти ни весь документ, ни уже отданные работы. Остальные ключи
+    верхнего уровня, например current_date, после полного прохода
+    доступны в fields; массив homeworks в fields остается пустым.
+    """
+
+    def __init__(self, chunks, key='homeworks'):
+        self.chunks = iter(chunks)
+        self.key = key
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.exhausted = False
+        self.fields = {}
+
+    @classmethod
+    def from_response(cls, response, chunk_size=STREAM_CHUNK_SIZE):
+        """Поток по телу ответа requests, открытого с stream=True."""
+        return cls(response.iter_content(chunk_size))
+
+    def _read(self):
+        if self.exhausted:
+            return False
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        for chunk in self.chunks:
+            text = self.decoder.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self.decoder.decode(b'', final=True)
+        self.exhausted = True
+        return False
+
+    def _peek(self):
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self._read():
+                return ''
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f'Ожидался один из символов {chars!r}, получен {char!r} '
+                f'в позиции {self.position}'
+            )
+        self.position += 1
+        return char
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self._read():
+                    raise
+                continue
+            if end < len(self.buffer) or not self._read():
+                self.position = end
+                return value
+
+    def __iter__(self):
+        """Элементы массива homeworks по мере получения."""
+        self._expect('{')
+        if self._peek() == '}':
+            self.position += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key == self.key and self._peek() == '[':
+                self.position += 1
+                self.fields[key] = []
+                if self._peek() == ']':
+                    self.position += 1
+                else:
+                    while True:
+                        yield self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                self.fields[key] = self._value()
+            if self._expect(',}') == '}':
+                return
@@ -0,0 +1,522 @@
+import asyncio
+import logging
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from os import getenv
+from typing import Callable
+
+import homework
+import metrics
+import profiling
+import recorder
+from accounts import ACCOUNTS_FILE, default_accounts, load_accounts
+from alerts import ErrorDigest
+from analytics import Analytics
+from bot_api import create_bot
+from breaker import STATE_VALUES, CircuitBreaker, acquire
+from exceptions import (CircuitOpenError, NoResponseError, RateLimitedError,
+                        ThrottledError)
+from homework import check_response, check_tokens, parse_status, request_api
+from logging_setup import configure_logging
+from quota import API_GLOBAL_BUDGET, QuotaManager
+from scheduler import (POLL_TICK, TimingWheel, first_poll, next_delay,
+                       next_poll)
+from sender import MessageQueue
+from state import StatusTable, homework_key
+from storage import STATE_DB, StateStore
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_REQUESTS = int(getenv('MAX_CONCURRENT_REQUESTS', 20))
+SEND_DRAIN_TIMEOUT = float(getenv('SEND_DRAIN_TIMEOUT', 10))
+SHUTDOWN_TIMEOUT = float(getenv('SHUTDOWN_TIMEOUT', 10))
+ACCOUNT_FAILURE_THRESHOLD = int(getenv('BREAKER_ACCOUNT_FAILURES', 3))
+
+
+@dataclass
+class Context:
+    """Общие для всех аккаунтов ресурсы цикла опроса."""
+
+    queue: MessageQueue
+    semaphore: asyncio.Semaphore
+    clock: Callable[[], float] = time.time
+    api_breaker: CircuitBreaker = None
+    quota: QuotaManager = None
+    breakers: dict = field(default_factory=dict)
+    stop: asyncio.Event = field(default_factory=asyncio.Event)
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def __post_init__(self):
+        """Создает предохранитель и бюджеты API-сервиса с часами контекста."""
+        if self.api_breaker is None:
+            self.api_breaker = CircuitBreaker('api', clock=self.clock)
+        if self.quota is None:
+            self.quota = QuotaManager(clock=self.clock)
+
+    def poll_now(self):
+        """Будит все аккаунты для немедленного опроса."""
+        wake, self.wake = self.wake, asyncio.Event()
+        wake.set()
+
+    async def sleep(self, delay):
+        """Пауза, которую прерывают остановка и poll_now."""
+        waiters = [
+            asyncio.ensure_future(self.stop.wait()),
+            asyncio.ensure_future(self.wake.wait()),
+        ]
+        try:
+            await asyncio.wait(
+                waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def fetch(self, account, current_timestamp):
+        """Ответ API-сервиса для аккаунта; пишется в запись трафика."""
+        try:
+            response = await asyncio.to_thread(
+                request_api, account.headers, current_timestamp,
+                lambda: self.quota.try_acquire(account.token)
+            )
+        except Exception as error:
+            recorder.record(
+                'error', account=account.name, chat_id=account.chat_id,
+                from_date=current_timestamp, type=type(error).__name__,
+                message=str(error)
+            )
+            raise
+        recorder.record(
+            'response', account=account.name, chat_id=account.chat_id,
+            from_date=current_timestamp, body=response
+        )
+        return response
+
+    def account_breaker(self, account):
+        """Предохранитель запросов к API-сервису от имени аккаунта."""
+        if account.name not in self.breakers:
+            breaker = CircuitBreaker(
+                f'api:{account.name}',
+                failure_threshold=ACCOUNT_FAILURE_THRESHOLD,
+                clock=self.clock
+            )
+            self.breakers[account.name] = breaker
+            metrics.CIRCUIT_STATE.set_function(
+                lambda: STATE_VALUES[breaker.state], name=breaker.name
+            )
+        return self.breakers[account.name]
+
+
+def report_error(queue, account, alerts, error, message):
+    """Сообщает об ошибке в чат, если она не повторяет недавнюю."""
+    if alerts.record(error, message):
+        queue.put(account.chat_id, message)
+    else:
+        metrics.ALERTS_SUPPRESSED.inc()
+
+
+async def poll_once(account, context, table, current_timestamp,
+                    analytics=None, queue=None, alerts=None):
+    """Одна итерация опроса аккаунта, возвращает новый курсор from_date.
+
+    Уведомления уходят в queue, по умолчанию — в очередь контекста.
+    Ошибка разбора одной работы не мешает обработать остальные.
+    """
+    iteration = profiling.span('iteration', account=account.name)
+    with metrics.ITERATION_LATENCY.time(), iteration:
+        return await _poll_once(
+            account, context, table, current_timestamp, analytics,
+            queue or context.queue, alerts
+        )
+
+
+def service_failure(error):
+    """Сбой самого API-сервиса: нет ответа или ответ 5xx."""
+    status_code = getattr(error, 'status_code', None)
+    return (
+        status_code is None
+        or status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+
+
+async def request_guarded(account, context, current_timestamp):
+    """Запрос к API-сервису через предохранители и бюджеты запросов.
+
+    Ответ 429 не считается сбоем сервиса: он приостанавливает запросы
+    на Retry-After секунд. Ответы 4xx, например отозванный токен,
+    размыкают только предохранитель аккаунта.
+    """
+    breakers = (context.account_breaker(account), context.api_breaker)
+    acquire(*breakers)
+    try:
+        context.quota.acquire(account.token)
+        async with context.semaphore:
+            response = await context.fetch(account, current_timestamp)
+    except RateLimitedError as error:
+        context.quota.throttle(account.token, error.retry_after)
+        for breaker in breakers:
+            breaker.release()
+        raise
+    except NoResponseError as error:
+        breakers[0].failure()
+        if service_failure(error):
+            context.api_breaker.failure()
+        else:
+            context.api_breaker.success()
+        raise
+    except BaseException:
+        for breaker in breakers:
+            breaker.release()
+        raise
+    for breaker in breakers:
+        breaker.success()
+    return response
+
+
+async def _poll_once(account, context, table, current_timestamp, analytics,
+                     queue, alerts):
+    response = await request_guarded(account, context, current_timestamp)
+    logger.info('[%s] Отправлен запрос к API-сервису', account.name)
+
+    with profiling.span('check_response', account=account.name):
+        homeworks = check_response(response)
+    with profiling.span('status_diff', account=account.name):
+        changed = table.changes(homeworks)
+    if len(changed) < len(homeworks):
+        logger.debug('[%s] Статус работы не изменился', account.name)
+    for item in changed:
+        try:
+            with profiling.span('parse_status', account=account.name):
+                message = parse_status(item)
+        except Exception as error:
+            metrics.ERRORS.inc(type=type(error).__name__)
+            message = f'Сбой в работе программы: {error}'
+            logger.error('[%s] %s', account.name, message)
+            if alerts is None:
+                queue.put(account.chat_id, message)
+            else:
+                report_error(queue, account, alerts, error, message)
+            if homework_key(item) is not None:
+                table.apply(item)
+            continue
+        queue.put(account.chat_id, message)
+        previous = table.apply(item)
+        if analytics is not None:
+            analytics.record(item, previous)
+
+    return int(response['current_date'])
+
+
+class Outgoing:
+    """Уведомления итерации, которые ставятся в очередь после сохранения."""
+
+    def __init__(self):
+        self.messages = []
+
+    def put(self, chat_id, message):
+        """Запоминает уведомление до записи в outbox."""
+        self.messages.append((chat_id, message))
+
+
+class AccountPoller:
+    """Состояние опроса одного аккаунта между итерациями."""
+
+    def __init__(self, account, context, store, current_timestamp=None):
+        stored_timestamp, statuses = store.load(account.name)
+        self.account = account
+        self.context = context
+        self.store = store
+        self.current_timestamp = stored_timestamp or current_timestamp
+        self.table = StatusTable(statuses)
+        self.analytics = Analytics.from_json(
+            store.load_analytics(account.name)
+        )
+        self.alerts = ErrorDigest(clock=context.clock)
+        self.failures = 0
+        self.resume_at = None
+
+    async def step(self):
+        """Итерация с обработкой ошибок; возвращает паузу до следующей.
+
+        Уведомления итерации записываются в outbox одной транзакцией
+        с курсором и статусами и только затем ставятся в очередь.
+        Снимок статистики пишется не чаще раза в SNAPSHOT_INTERVAL
+        секунд, остаток сохраняет save_analytics при остановке.
+        """
+        account = self.account
+        queue = Outgoing()
+        try:
+            self.current_timestamp = await poll_once(
+                account, self.context, self.table, self.current_timestamp,
+                self.analytics, queue, self.alerts
+            )
+            self.failures = 0
+
+        except CircuitOpenError as error:
+            metrics.ERRORS.inc(type=type(error).__name__)
+            logger.warning('[%s] %s', account.name, error)
+
+        except (ThrottledError, RateLimitedError) as error:
+            self.throttled(error)
+
+        except NoResponseError as error:
+            metrics.ERRORS.inc(type=type(error).__name__)
+            self.failures += 1
+            message = f'Сбой в работе программы: {error}'
+            logger.error(
+                '[%s] Нет ответа от API-сервиса, попытка %s: %s',
+                account.name, self.failures, error
+            )
+            report_error(queue, account, self.alerts, error, message)
+
+        except Exception as error:
+            metrics.ERRORS.inc(type=type(error).__name__)
+            message = f'Сбой в работе программы: {error}'
+            logger.error('[%s] %s', account.name, message)
+            report_error(queue, account, self.alerts, error, message)
+
+        digest = self.alerts.digest()
+        if digest:
+            queue.put(account.chat_id, digest)
+
+        ids = self.store.save(
+            account.name, self.current_timestamp, self.table.pop_dirty(),
+            self.analytics.snapshot(self.context.clock()), queue.messages
+        )
+        for outbox_id, (chat_id, message) in zip(ids, queue.messages):
+            self.context.queue.put(chat_id, message, outbox_id)
+
+        return self.interval()
+
+    def save_analytics(self):
+        """Сохраняет статистику, снимок которой еще не записан."""
+        snapshot = self.analytics.snapshot(self.context.clock(), interval=0)
+        if snapshot is not None:
+            self.store.save(self.account.name, analytics=snapshot)
+
+    def interval(self):
+        """Пауза до следующего опроса по статусу работы и числу сбоев."""
+        return next_delay(self.table.current_status(), self.failures)
+
+    def throttled(self, error):
+        """Откладывает опрос до конца лимита или пропускает его.
+
+        Если лимит кончится раньше обычного интервала, опрос
+        откладывается до этого момента, иначе ждет следующего слота.
+        """
+        wait, scope = self.context.quota.retry_in(self.account.token)
+        interval = self.interval()
+        if wait <= interval:
+            action = 'deferred'
+            self.resume_at = self.context.clock() + wait
+        else:
+            action = 'dropped'
+        metrics.API_THROTTLED.inc(scope=scope, action=action)
+        logger.warning('[%s] %s', self.account.name, error)
+
+
+class Dispatcher:
+    """Запускает итерации опроса аккаунтов по колесу таймеров.
+
+    Вместо отдельной паузы на каждый аккаунт один цикл раз в тик
+    забирает из колеса аккаунты, которым пора опрашиваться.
+    """
+
+    def __init__(self, pollers, context, tick=None):
+        self.pollers = {poller.account.name: poller for poller in pollers}
+        self.context = context
+        self.wheel = TimingWheel(tick or POLL_TICK, start=context.clock())
+        self.running = {}
+
+    def launch(self, name):
+        """Запускает итерацию аккаунта, если она еще не идет."""
+        if name in self.running:
+            return
+        self.wheel.cancel(name)
+        self.running[name] = asyncio.create_task(self.step(name))
+
+    async def step(self, name):
+        """Итерация аккаунта и планирование следующей."""
+        try:
+            interval = await self.pollers[name].step()
+        except Exception as error:
+            logger.error(
+                '[%s] Опрос аккаунта завершился с ошибкой: %s', name, error
+            )
+            self.context.stop.set()
+            return
+        finally:
+            del self.running[name]
+        if not self.context.stop.is_set():
+            poller = self.pollers[name]
+            when = poller.resume_at or next_poll(
+                name, interval, self.context.clock()
+            )
+            poller.resume_at = None
+            self.wheel.schedule(name, when)
+
+    async def run(self):
+        """Цикл диспетчера до остановки; poll_now опрашивает всех сразу.
+
+        Первый опрос аккаунта планируется в его фазе, поэтому после
+        запуска запросы не уходят одной пачкой.
+        """
+        now = self.context.clock()
+        for name, poller in self.pollers.items():
+            self.wheel.schedule(
+                name, first_poll(name, poller.interval(), now)
+            )
+        while not self.context.stop.is_set():
+            wake = self.context.wake
+            await self.context.sleep(self.wheel.tick)
+            if self.context.stop.is_set():
+                break
+            if wake.is_set():
+                due = list(self.pollers)
+            else:
+                due = self.wheel.advance(self.context.clock())
+            for name in due:
+                self.launch(name)
+
+
+def install_signal_handlers(context):
+    """SIGTERM и SIGINT останавливают опрос, SIGUSR1 — опрашивает сразу."""
+    loop = asyncio.get_running_loop()
+    handlers = {
+        signal.SIGTERM: context.stop.set,
+        signal.SIGINT: context.stop.set,
+        signal.SIGUSR1: context.poll_now,
+    }
+    for signum, handler in handlers.items():
+        loop.add_signal_handler(signum, handler)
+    return list(handlers)
+
+
+async def run(accounts, bot, store=None, current_timestamp=None,
+              handle_signals=False, quota=None):
+    """Опрашивает все аккаунты конкурентно в одном цикле событий.
+
+    Без store состояние хранится только в памяти. По умолчанию паузы
+    после ответа 429 хранятся в store и общие для процессов с той же
+    базой, а бюджеты запросов — свои у процесса. Неотправленные
+    уведомления из outbox ставятся в очередь до начала опроса.
+    После остановки итерации завершаются не дольше SHUTDOWN_TIMEOUT
+    секунд, затем очередь отправки дорабатывает не дольше
+    SEND_DRAIN_TIMEOUT.
+    """
+    store = store or StateStore(':memory:')
+    context = Context(
+        queue=MessageQueue(bot, outbox=store).start(),
+        semaphore=asyncio.Semaphore(MAX_CONCURRENT_REQUESTS),
+        quota=quota or QuotaManager(store=store),
+    )
+    unsent = store.pending_messages(account.name for account in accounts)
+    for outbox_id, chat_id, message in unsent:
+        context.queue.put(chat_id, message, outbox_id)
+    if unsent:
+        logger.info('Повторная отправка из outbox: %s', len(unsent))
+    signals = install_signal_handlers(context) if handle_signals else []
+    metrics.QUEUE_DEPTH.set_function(context.queue.depth, queue='telegram')
+    metrics.CIRCUIT_STATE.set_function(
+        lambda: STATE_VALUES[context.api_breaker.state], name='api'
+    )
+    dispatcher = Dispatcher(
+        [
+            AccountPoller(account, context, store, current_timestamp)
+            for account in accounts
+        ],
+        context,
+    )
+    dispatching = asyncio.create_task(dispatcher.run())
+    stopping = asyncio.create_task(context.stop.wait())
+    tasks = [dispatching, stopping]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        context.stop.set()
+        logger.info('Остановка опроса')
+        if dispatching.done() and dispatching.exception():
+            logger.error(
+                'Диспетчер опроса завершился с ошибкой: %s',
+                dispatching.exception()
+            )
+        running = list(dispatcher.running.values())
+        if running:
+            _, pending = await asyncio.wait(running, timeout=SHUTDOWN_TIMEOUT)
+            if pending:
+                logger.warning('Прервано итераций опроса: %s', len(pending))
+    finally:
+        tasks.extend(dispatcher.running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for poller in dispatcher.pollers.values():
+            poller.save_analytics()
+        loop = asyncio.get_running_loop()
+        for signum in signals:
+            loop.remove_signal_handler(signum)
+        metrics.QUEUE_DEPTH.remove(queue='telegram')
+        left = await asyncio.to_thread(
+            context.queue.close, SEND_DRAIN_TIMEOUT
+        )
+        if left:
+            logger.error('Не отправлено сообщений: %s', left)
+
+
+def serve(accounts, worker=None, workers=1):
+    """Запускает опрос аккаунтов в текущем процессе до остановки.
+
+    worker — номер процесса при запуске из supervisor: к файлам записи
+    добавляется суффикс .<worker>, а порт метрик сдвигается на worker + 1.
+    Общий бюджет запросов делится поровну между workers процессами.
+    """
+    def per_worker(path):
+        return path if worker is None else f'{path}.{worker}'
+
+    bot = create_bot(homework.TELEGRAM_TOKEN)
+    if profiling.PROFILE_TRACE:
+        profiling.enable_tracing(per_worker(profiling.PROFILE_TRACE))
+    profiling.install_signal_handler()
+    if recorder.RECORD_TRAFFIC:
+        recorder.enable_recording(per_worker(recorder.RECORD_TRAFFIC))
+    if metrics.METRICS_PORT:
+        port = int(metrics.METRICS_PORT)
+        if worker is not None:
+            port += worker + 1
+        metrics.start_server(port)
+        logger.info('Метрики доступны на порту %s', port)
+    logger.info('Запуск опроса для аккаунтов: %s', len(accounts))
+
+    store = StateStore(STATE_DB)
+    quota = QuotaManager(budget=API_GLOBAL_BUDGET / workers, store=store)
+    try:
+        asyncio.run(
+            run(accounts, bot, store, handle_signals=True, quota=quota)
+        )
+    finally:
+        store.close()
+
+
+def main():
+    """Основная логика работы бота."""
+    if ACCOUNTS_FILE:
+        accounts = load_accounts(ACCOUNTS_FILE)
+        if not homework.TELEGRAM_TOKEN:
+            message = 'Не хватает токена telegram'
+            logger.critical(message)
+            sys.exit(message)
+    else:
+        if not check_tokens():
+            message = 'Не хватает токенов'
+            logger.critical(message)
+            sys.exit(message)
+        accounts = default_accounts()
+
+    serve(accounts)
+
+
+if __name__ == '__main__':
+    configure_logging()
+    main()
@@ -16,3 +16,43 @@ class SendError(Exception):
 
 class EmptyHomeworkError(Exception):
     pass
+
+
+class TelegramApiError(Exception):
+
+    def __init__(self, message, error_code=None):
+        super().__init__(message)
+        self.error_code = error_code
+
+
+class RetryAfterError(TelegramApiError):
+
+    def __init__(self, message, retry_after):
+        super().__init__(message, 429)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class UnexpectedStatusError(NoResponseError):
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitedError(NoResponseError):
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ThrottledError(Exception):
+
+    def __init__(self, message, retry_in, scope):
+        super().__init__(message)
+        self.retry_in = retry_in
+        self.scope = scope
@@ -0,0 +1,289 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from homework import HOMEWORK_STATUSES
+
+API_PATH = '/api/user_api/homework_statuses/'
+STATUSES = list(HOMEWORK_STATUSES)
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def latency_sampler(spec):
+    """Функция, возвращающая задержку ответа в секундах.
+
+    spec — число секунд или строка: fixed:0.05, uniform:0.01,0.1,
+    exp:0.05 (среднее), lognormal:mu,sigma.
+    """
+    if spec is None:
+        return lambda: 0
+    if isinstance(spec, (int, float)):
+        return lambda: spec
+    kind, _, args = spec.partition(':')
+    values = [float(value) for value in args.split(',') if value]
+    samplers = {
+        'fixed': lambda: values[0],
+        'uniform': lambda: random.uniform(*values),
+        'exp': lambda: random.expovariate(1 / values[0]),
+        'lognormal': lambda: random.lognormvariate(*values),
+    }
+    if kind not in samplers:
+        raise ValueError(f'Неизвестное распределение задержки: {spec}')
+    return samplers[kind]
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """Общая часть обработчиков: задержка, сбои и ответ json."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def reply(self, status, data, headers=None):
+        """Отправляет ответ json с нужным кодом."""
+        body = json.dumps(data, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def inject_faults(self):
+        """Задержка и случайные сбои; True, если ответ уже отправлен."""
+        server = self.server
+        time.sleep(server.latency())
+        with server.lock:
+            server.requests += 1
+        if random.random() < server.error_rate:
+            with server.lock:
+                server.errors += 1
+            self.reply(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'fake failure'}
+            )
+            return True
+        if random.random() < server.rate_limit_rate:
+            with server.lock:
+                server.throttled += 1
+            self.rate_limited()
+            return True
+        return False
+
+    def rate_limited(self):
+        """Ответ 429."""
+        self.reply(
+            HTTPStatus.TOO_MANY_REQUESTS, {'error': 'too many requests'},
+            {'Retry-After': self.server.retry_after}
+        )
+
+    def log_message(self, *args):
+        """Не пишет лог каждого запроса в stderr."""
+
+
+class PracticumHandler(FakeHandler):
+    """GET homework_statuses с проверкой OAuth-токена."""
+
+    def do_GET(self):
+        """Работы токена, изменившиеся начиная с from_date."""
+        url = urlparse(self.path)
+        if url.path != API_PATH:
+            self.reply(HTTPStatus.NOT_FOUND, {'error': 'not found'})
+            return
+        authorization = self.headers.get('Authorization', '')
+        if not authorization.startswith('OAuth '):
+            self.reply(HTTPStatus.UNAUTHORIZED, {'code': 'not_authenticated'})
+            return
+        if self.inject_faults():
+            return
+        try:
+            from_date = int(parse_qs(url.query)['from_date'][0])
+        except (KeyError, ValueError):
+            self.reply(HTTPStatus.BAD_REQUEST, {'code': 'bad_request'})
+            return
+        self.reply(HTTPStatus.OK, {
+            'homeworks': self.server.homeworks_since(
+                authorization[len('OAuth '):], from_date
+            ),
+            'current_date': int(time.time()),
+        })
+
+
+class TelegramHandler(FakeHandler):
+    """POST /bot<token>/sendMessage."""
+
+    def rate_limited(self):
+        """Ответ 429 в формате Bot API."""
+        self.reply(HTTPStatus.TOO_MANY_REQUESTS, {
+            'ok': False,
+            'error_code': 429,
+            'description': 'Too Many Requests: retry after '
+                           f'{self.server.retry_after}',
+            'parameters': {'retry_after': self.server.retry_after},
+        })
+
+    def do_POST(self):
+        """Принимает сообщение и запоминает его."""
+        data = json.loads(
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            or b'{}'
+        )
+        if not self.path.endswith('/sendMessage'):
+            self.reply(HTTPStatus.NOT_FOUND, {
+                'ok': False, 'error_code': 404, 'description': 'Not Found'
+            })
+            return
+        if self.inject_faults():
+            return
+        if 'chat_id' not in data or not data.get('text'):
+            self.reply(HTTPStatus.BAD_REQUEST, {
+                'ok': False, 'error_code': 400,
+                'description': 'Bad Request: chat_id and text are required'
+            })
+            return
+        with self.server.lock:
+            self.server.messages.append((str(data['chat_id']), data['text']))
+            message_id = len(self.server.messages)
+        self.reply(HTTPStatus.OK, {'ok': True, 'result': {
+            'message_id': message_id,
+            'chat': {'id': data['chat_id']},
+            'date': int(time.time()),
+            'text': data['text'],
+        }})
+
+
+class FakeServer(ThreadingHTTPServer):
+    """Локальный сервер-заглушка с задержками и сбоями."""
+
+    daemon_threads = True
+
+    def __init__(self, handler, port=0, latency=None, error_rate=0,
+                 rate_limit_rate=0, retry_after=1):
+        super().__init__(('127.0.0.1', port), handler)
+        self.latency = latency_sampler(latency)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.url = f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self):
+        """Запускает сервер в фоновом потоке."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер и закрывает сокет."""
+        self.shutdown()
+        self.server_close()
+
+
+class FakePracticumServer(FakeServer):
+    """Заглушка API-сервиса домашних работ.
+
+    У каждого токена homeworks работ; при каждом запросе с вероятностью
+    change_rate одна из них меняет статус.
+    """
+
+    def __init__(self, homeworks=1, change_rate=0, **kwargs):
+        super().__init__(PracticumHandler, **kwargs)
+        self.homeworks_count = homeworks
+        self.change_rate = change_rate
+        self.accounts = {}
+
+    @property
+    def endpoint(self):
+        """Адрес homework_statuses для PRACTICUM_ENDPOINT."""
+        return self.url + API_PATH
+
+    def _generate(self, token):
+        now = int(time.time())
+        return [
+            {
+                'id': number,
+                'status': STATUSES[number % len(STATUSES)],
+                'homework_name': f'{token[:8]}__hw{number}.zip',
+                'reviewer_comment': 'Всё нравится',
+                'date_updated': now - (self.homeworks_count - number) * 60,
+                'lesson_name': f'Проект {number % 10}',
+            }
+            for number in range(self.homeworks_count)
+        ]
+
+    def homeworks_since(self, token, from_date):
+        """Работы токена с date_updated не раньше from_date."""
+        with self.lock:
+            homeworks = self.accounts.get(token)
+            if homeworks is None:
+                homeworks = self.accounts[token] = self._generate(token)
+            if homeworks and random.random() < self.change_rate:
+                homework = random.choice(homeworks)
+                homework['status'] = random.choice(STATUSES)
+                homework['date_updated'] = int(time.time())
+            selected = [
+                dict(homework, date_updated=time.strftime(
+                    DATE_FORMAT, time.gmtime(homework['date_updated'])
+                ))
+                for homework in homeworks
+                if homework['date_updated'] >= from_date
+            ]
+        return selected
+
+
+class FakeTelegramServer(FakeServer):
+    """Заглушка Bot API, запоминающая отправленные сообщения."""
+
+    def __init__(self, **kwargs):
+        super().__init__(TelegramHandler, **kwargs)
+        self.messages = []
+
+
+def main():
+    """Локальные заглушки API-сервиса и Bot API для нагрузочных тестов."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--api-port', type=int, default=8081)
+    parser.add_argument('--telegram-port', type=int, default=8082)
+    parser.add_argument('--latency', default=None,
+                        help='fixed:S, uniform:A,B, exp:MEAN, lognormal:M,S')
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0)
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--homeworks', type=int, default=1)
+    parser.add_argument('--change-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    faults = {
+        'latency': args.latency,
+        'error_rate': args.error_rate,
+        'rate_limit_rate': args.rate_limit_rate,
+        'retry_after': args.retry_after,
+    }
+    api = FakePracticumServer(
+        homeworks=args.homeworks, change_rate=args.change_rate,
+        port=args.api_port, **faults
+    ).start()
+    telegram = FakeTelegramServer(port=args.telegram_port, **faults).start()
+    print(f'PRACTICUM_ENDPOINT={api.endpoint}')
+    print(f'TELEGRAM_API_URL={telegram.url}')
+    try:
+        while True:
+            time.sleep(10)
+            print(
+                f'API: запросов {api.requests}, сбоев {api.errors}, '
+                f'429 {api.throttled}; telegram: сообщений '
+                f'{len(telegram.messages)}, 429 {telegram.throttled}'
+            )
+    except KeyboardInterrupt:
+        api.stop()
+        telegram.stop()
+
+
+if __name__ == '__main__':
+    main()
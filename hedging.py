@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from os import getenv
+
+from exceptions import NoResponseError
+from http_session import CONNECT_TIMEOUT, POOL_MAXSIZE, READ_TIMEOUT
+from metrics import API_HEDGES
+
+API_DEADLINE = float(getenv('API_DEADLINE', CONNECT_TIMEOUT + READ_TIMEOUT))
+API_HEDGE = getenv('API_HEDGE', '').lower() in ('1', 'true', 'yes')
+HEDGE_QUANTILE = float(getenv('API_HEDGE_QUANTILE', 0.95))
+HEDGE_MIN_SAMPLES = int(getenv('API_HEDGE_MIN_SAMPLES', 20))
+HEDGE_WINDOW = 500
+
+
+def attempt_timeout(remaining):
+    """Таймауты (connect, read) попытки, не выходящие за остаток срока."""
+    return (min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining))
+
+
+class LatencyWindow:
+    """Длительности последних успешных запросов."""
+
+    def __init__(self, size=HEDGE_WINDOW):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def observe(self, seconds):
+        """Добавляет длительность запроса."""
+        with self.lock:
+            self.samples.append(seconds)
+
+    def quantile(self, q):
+        """Квантиль длительностей окна."""
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class Hedger:
+    """Запросы с общим сроком и дублированием медленных попыток.
+
+    Если первая попытка не ответила за наблюдаемый квантиль quantile,
+    запускается вторая и берется первый успешный ответ. Прервать уже
+    начатый HTTP-запрос нельзя, поэтому проигравшая попытка отменяется,
+    только если еще не началась, а иначе ее ответ отбрасывается.
+    """
+
+    def __init__(self, deadline=API_DEADLINE, hedge=API_HEDGE,
+                 quantile=HEDGE_QUANTILE, min_samples=HEDGE_MIN_SAMPLES,
+                 window=HEDGE_WINDOW, workers=POOL_MAXSIZE,
+                 clock=time.monotonic):
+        self.deadline = deadline
+        self.hedge = hedge
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.latencies = LatencyWindow(window)
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='hedge')
+        self.clock = clock
+
+    def hedge_delay(self):
+        """Через сколько секунд запускать дублирующую попытку, или None."""
+        if not self.hedge or len(self.latencies.samples) < self.min_samples:
+            return None
+        delay = self.latencies.quantile(self.quantile)
+        return delay if delay < self.deadline else None
+
+    def _attempt(self, attempt, deadline):
+        started = self.clock()
+        remaining = deadline - started
+        if remaining <= 0:
+            raise NoResponseError(
+                f'Истек срок ожидания ответа: {self.deadline} с'
+            )
+        result = attempt(remaining)
+        self.latencies.observe(self.clock() - started)
+        return result
+
+    def call(self, attempt, admit=None):
+        """Вызывает attempt(remaining) и возвращает первый успешный ответ.
+
+        attempt получает остаток срока в секундах. Дублирующая попытка
+        запускается, только если admit() вернул True. Ошибка первой
+        завершившейся попытки пробрасывается, если дублирующая
+        попытка не запущена или тоже завершилась ошибкой.
+        """
+        deadline = self.clock() + self.deadline
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._attempt(attempt, deadline)
+
+        primary = self.executor.submit(self._attempt, attempt, deadline)
+        pending = self._hedged(primary, attempt, deadline, delay, admit)
+        return self._first_success(primary, pending, deadline)
+
+    def _hedged(self, primary, attempt, deadline, delay, admit):
+        done, _ = wait({primary}, timeout=delay)
+        if done:
+            return {primary}
+        if admit is not None and not admit():
+            API_HEDGES.inc(result='throttled')
+            return {primary}
+        API_HEDGES.inc(result='fired')
+        return {
+            primary, self.executor.submit(self._attempt, attempt, deadline)
+        }
+
+    def _first_success(self, primary, pending, deadline):
+        error = None
+        while pending:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            done, pending = wait(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        API_HEDGES.inc(result='won')
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                error = error or future.exception()
+
+        for future in pending:
+            future.cancel()
+        if error is not None and not pending:
+            raise error
+        raise NoResponseError(f'Истек срок ожидания ответа: {self.deadline} с')
+
+
+_hedger = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger():
+    """Общий для процесса Hedger, создается при первом обращении."""
+    global _hedger
+    if _hedger is None:
+        with _hedger_lock:
+            if _hedger is None:
+                _hedger = Hedger()
+    return _hedger
@@ -1,24 +1,34 @@
 import logging
-import sys
 import time
+from email.utils import parsedate_to_datetime
 from http import HTTPStatus
 from os import getenv
 
 import requests
 from dotenv import load_dotenv
-from telegram import Bot
 
+from decoding import decode_response
 from exceptions import (EmptyHomeworkError, EmptyResponseError,
-                        NoResponseError, SendError)
+                        NoResponseError, RateLimitedError, SendError,
+                        UnexpectedStatusError)
+from hedging import attempt_timeout, get_hedger
+from http_session import get_session
+from metrics import API_LATENCY, SEND_LATENCY
+from profiling import span
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 PRACTICUM_TOKEN = getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = getenv('TELEGRAM_CHAT_ID')
 
 RETRY_TIME = 600
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+ENDPOINT = getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
 HOMEWORK_STATUSES = {
@@ -28,37 +38,103 @@ HOMEWORK_STATUSES = {
 }
 
 
-def send_message(bot, message):
-    """Отправка сообщений в чат telegram."""
+def send_to_chat(bot, chat_id, message):
+    """Отправка сообщения в указанный чат telegram."""
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        with SEND_LATENCY.time():
+            bot.send_message(chat_id, message)
     except Exception as error:
         raise SendError(error)
 
 
-def get_api_answer(current_timestamp):
-    """Запрос к API-сервису."""
+def send_message(bot, message):
+    """Отправка сообщений в чат telegram."""
+    send_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def auth_headers(token):
+    """Заголовки авторизации для токена API-сервиса."""
+    return {'Authorization': f'OAuth {token}'}
+
+
+def retry_after_header(value):
+    """Пауза в секундах из заголовка Retry-After или None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+
+def fetch_statuses(headers, params, remaining, stream=False):
+    """Одна попытка запроса к API-сервису в пределах остатка срока.
+
+    С stream=True тело ответа не читается заранее: его нужно разобрать
+    потоком и закрыть ответ.
+    """
+    try:
+        with API_LATENCY.time(), span('http_request'):
+            response = get_session().get(
+                ENDPOINT,
+                headers=headers,
+                params=params,
+                timeout=attempt_timeout(remaining),
+                stream=stream
+            )
+    except requests.RequestException as error:
+        raise NoResponseError(error)
+
+    if response.status_code != HTTPStatus.OK:
+        if stream:
+            response.close()
+        if response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+            raise RateLimitedError(
+                'API-сервис ограничил частоту запросов',
+                retry_after_header(response.headers.get('Retry-After'))
+            )
+        raise UnexpectedStatusError(
+            f'API-сервис ответил кодом {response.status_code}',
+            response.status_code
+        )
+
+    return response
+
+
+def request_api(headers, current_timestamp, admit_hedge=None):
+    """Запрос к API-сервису с заголовками конкретного аккаунта.
+
+    admit_hedge() вызывается перед дублирующей попыткой и должен списать
+    ее из бюджетов запросов; False отменяет дублирование.
+    """
     timestamp = current_timestamp or int(time.time())
 
     params = {'from_date': timestamp}
 
-    response = requests.get(
-        ENDPOINT,
-        headers=HEADERS,
-        params=params
+    response = get_hedger().call(
+        lambda remaining: fetch_statuses(headers, params, remaining),
+        admit_hedge
     )
 
-    if response.status_code != HTTPStatus.OK:
-        raise NoResponseError
-
     try:
-        response = response.json()
+        with span('json_decode'):
+            response = decode_response(response)
     except Exception as error:
         raise Exception(error)
 
     return response
 
 
+def get_api_answer(current_timestamp):
+    """Запрос к API-сервису."""
+    return request_api(HEADERS, current_timestamp)
+
+
 def check_response(response):
     """Возвращает список домашних работ."""
     if not response:
@@ -105,113 +181,3 @@ def parse_status(homework):
 def check_tokens():
     """Проверка доступности переменных окружения."""
     return all([PRACTICUM_TOKEN, TELEGRAM_TOKEN, TELEGRAM_CHAT_ID])
-
-
-def message_logging(current_report, perv_report, message):
-    """Добавляет логирование и счетчик сообщений."""
-    if current_report != perv_report:
-        send_message(bot, message)
-        logger.info('Отправлено сообщение в чат telegram.')
-        perv_report = current_report.copy()
-
-        return perv_report
-
-
-def status_message(message, current_report):
-    """Отправляет сообщение при изменении статуса."""
-    if message != current_report['status']:
-        send_message(bot, message)
-        logger.info('Отправлено сообщение в чат telegram.')
-        current_report['status'] = message
-    else:
-        logger.debug('Статус работы не изменился')
-
-    return current_report
-
-
-def main():
-    """Основная логика работы бота."""
-    if not check_tokens():
-        message = 'Не хватает токенов'
-        logger.critical(message)
-        send_message(bot, message)
-        logger.info('Отправлено сообщение в чат telegram.')
-        sys.exit(message)
-
-    current_timestamp = int(time.time())
-
-    current_report = {
-        'status': '',
-        'messages/output': '',
-    }
-
-    perv_report = {}
-
-    while True:
-        try:
-            response = get_api_answer(current_timestamp)
-            logger.info('Отправлен запрос к API-сервису')
-            message = parse_status(check_response(response)[0])
-            logger.info('Проверка ответа сервера')
-            current_report = status_message(message, current_report)
-
-            current_timestamp = int(response['current_date'])
-
-        except NoResponseError as error:
-            message = 'No response'
-            logger.error('No response', error)
-            current_report['message'] = message
-            perv_report = message_logging(
-                current_report,
-                perv_report,
-                message
-            )
-
-        except EmptyResponseError as error:
-            message = 'Empty response'
-            logger.error(message, error)
-            current_report['message'] = message
-            perv_report = message_logging(
-                current_report,
-                perv_report,
-                message
-            )
-
-        except EmptyHomeworkError as error:
-            message = 'Empty homework'
-            logger.error(message, error)
-            current_report['message'] = message
-            perv_report = message_logging(
-                current_report,
-                perv_report,
-                message
-            )
-
-        except Exception as error:
-            message = f'Сбой в работе программы: {error}'
-            logger.error(message)
-            current_report['message'] = message
-            perv_report = message_logging(
-                current_report,
-                perv_report,
-                message
-            )
-
-        finally:
-            time.sleep(RETRY_TIME)
-
-
-if __name__ == '__main__':
-
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(funcName)s - %(message)s'
-    )
-    handler = logging.StreamHandler(stream=sys.stdout)
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-
-    bot = Bot(token=TELEGRAM_TOKEN)
-
-    main()
@@ -0,0 +1,52 @@
+import threading
+from os import getenv
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_CONNECTIONS = int(getenv('HTTP_POOL_CONNECTIONS', 4))
+POOL_MAXSIZE = int(getenv('HTTP_POOL_MAXSIZE', 20))
+CONNECT_TIMEOUT = float(getenv('HTTP_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(getenv('HTTP_READ_TIMEOUT', 30))
+TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_connections=POOL_CONNECTIONS,
+                   pool_maxsize=POOL_MAXSIZE):
+    """Сессия с пулом keep-alive соединений.
+
+    pool_connections — число хостов, для которых хранятся пулы,
+    pool_maxsize — предел соединений к одному хосту: при его
+    достижении запрос ждет освободившееся соединение.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """Общая для процесса сессия, создается при первом обращении."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_session():
+    """Закрывает общую сессию и все соединения пула."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,126 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from os import getenv
+
+LOG_LEVEL = getenv('LOG_LEVEL', 'INFO').upper()
+LOG_JSON = getenv('LOG_JSON', '').lower() in ('1', 'true', 'yes')
+LOG_SAMPLE_EVERY = int(getenv('LOG_SAMPLE_EVERY', 100))
+LOG_SAMPLE_LEVEL = logging.DEBUG
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(funcName)s - %(message)s'
+
+_listener = None
+_queue_handler = None
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает первую и каждую every-ю из повторяющихся записей.
+
+    Повторами считаются записи одного логгера с одним шаблоном
+    сообщения не выше уровня level; остальные записи проходят всегда.
+    """
+
+    def __init__(self, every=LOG_SAMPLE_EVERY, level=LOG_SAMPLE_LEVEL):
+        super().__init__()
+        self.every = every
+        self.level = level
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        """True, если запись нужно вывести."""
+        if self.every <= 1 or record.levelno > self.level:
+            return True
+        key = (record.name, record.msg)
+        with self.lock:
+            count = self.counts.get(key, 0)
+            self.counts[key] = count + 1
+        if count % self.every:
+            return False
+        record.sampled = self.every if count else 1
+        return True
+
+
+class RecordQueueHandler(QueueHandler):
+    """QueueHandler, который не вклеивает трассировку в сообщение.
+
+    Стандартный prepare кладет трассировку в msg и стирает exc_info;
+    здесь она остается в exc_text, и форматтер выводит ее сам.
+    """
+
+    def prepare(self, record):
+        """Копия записи, готовая к передаче через очередь."""
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record):
+        """Поля записи в JSON."""
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'function': record.funcName,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'sampled', 1) > 1:
+            data['sampled'] = record.sampled
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+def configure_logging(level=LOG_LEVEL, json_output=LOG_JSON,
+                      stream=sys.stdout):
+    """Вывод логов процесса через очередь и фоновый поток.
+
+    Логгеры только кладут запись в очередь, а запись в stream идет
+    в потоке QueueListener, поэтому медленный stdout не задерживает
+    опрос. Очередь остается неограниченной, чтобы не терять записи.
+    """
+    global _listener, _queue_handler
+    stop_logging()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(
+        JsonFormatter() if json_output else logging.Formatter(TEXT_FORMAT)
+    )
+    log_queue = queue.SimpleQueue()
+    _queue_handler = RecordQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter())
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(level)
+    root_logger.addHandler(_queue_handler)
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Дописывает записи из очереди и останавливает фоновый поток."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    _listener = _queue_handler = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,252 @@
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import getenv
+
+METRICS_PORT = getenv('METRICS_PORT')
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+
+REGISTRY = []
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{escape(value)}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def escape(value):
+    """Экранирует значение метки для текстового формата Prometheus."""
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+class Metric:
+    """Базовая метрика, регистрируемая для экспорта."""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """Пары (суффикс и метки, значение) для экспорта."""
+        return []
+
+    def render(self):
+        """Метрика в текстовом формате Prometheus."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        lines.extend(
+            f'{self.name}{suffix} {value}' for suffix, value in self.samples()
+        )
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        """Увеличивает счетчик для набора меток."""
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Текущее значение для набора меток."""
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self):
+        """Значения счетчика для экспорта."""
+        with self.lock:
+            return [
+                (_labels(self.labelnames, key), value)
+                for key, value in sorted(self.values.items())
+            ]
+
+
+class Gauge(Metric):
+    """Значение, которое читается функцией в момент экспорта."""
+
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.functions = {}
+
+    def set_function(self, function, **labels):
+        """Задает функцию, возвращающую значение для набора меток."""
+        with self.lock:
+            self.functions[self._key(labels)] = function
+
+    def remove(self, **labels):
+        """Убирает значение для набора меток."""
+        with self.lock:
+            self.functions.pop(self._key(labels), None)
+
+    def samples(self):
+        """Значения, прочитанные функциями в момент экспорта."""
+        with self.lock:
+            functions = sorted(self.functions.items())
+        return [
+            (_labels(self.labelnames, key), function())
+            for key, function in functions
+        ]
+
+
+class Histogram(Metric):
+    """Гистограмма длительностей с фиксированными корзинами."""
+
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, value, **labels):
+        """Учитывает одно наблюдение."""
+        key = self._key(labels)
+        with self.lock:
+            counts, total = self.values.get(
+                key, ([0] * (len(self.buckets) + 1), 0)
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self.values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Измеряет длительность блока with."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        """Корзины, сумма и число наблюдений для экспорта."""
+        samples = []
+        with self.lock:
+            items = sorted(
+                (key, (list(counts), total))
+                for key, (counts, total) in self.values.items()
+            )
+        for key, (counts, total) in items:
+            cumulative = 0
+            bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                samples.append((
+                    '_bucket' + _labels(
+                        self.labelnames + ('le',), key + (bound,)
+                    ),
+                    cumulative
+                ))
+            labels = _labels(self.labelnames, key)
+            samples.append(('_sum' + labels, total))
+            samples.append(('_count' + labels, cumulative))
+        return samples
+
+
+def render():
+    """Все зарегистрированные метрики в текстовом формате Prometheus."""
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Отдает метрики по GET /metrics."""
+
+    def do_GET(self):
+        """Отдает текущие значения метрик."""
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = render().encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Не пишет лог каждого запроса в stderr."""
+
+
+def start_server(port, host='0.0.0.0'):
+    """Запускает HTTP-сервер метрик в фоновом потоке."""
+    server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+API_LATENCY = Histogram(
+    'homework_api_request_seconds', 'Длительность запроса к API-сервису'
+)
+SEND_LATENCY = Histogram(
+    'homework_telegram_send_seconds', 'Длительность отправки в telegram'
+)
+ITERATION_LATENCY = Histogram(
+    'homework_iteration_seconds', 'Длительность итерации опроса аккаунта'
+)
+ERRORS = Counter(
+    'homework_errors_total', 'Ошибки по типу исключения', ('type',)
+)
+ALERTS_SUPPRESSED = Counter(
+    'homework_alerts_suppressed_total', 'Подавленные повторы ошибок'
+)
+MESSAGES_SENT = Counter(
+    'homework_messages_sent_total', 'Отправленные сообщения telegram'
+)
+CIRCUIT_STATE = Gauge(
+    'homework_circuit_state',
+    'Состояние предохранителя: 0 — замкнут, 1 — пробный вызов, 2 — разомкнут',
+    ('name',)
+)
+QUEUE_DEPTH = Gauge(
+    'homework_queue_depth', 'Длина очередей', ('queue',)
+)
+API_HEDGES = Counter(
+    'homework_api_hedges_total',
+    'Дублирующие запросы к API-сервису: fired — запущен, won — ответил '
+    'первым, throttled — не запущен из-за бюджета запросов',
+    ('result',)
+)
+API_RATE_LIMITED = Counter(
+    'homework_api_rate_limited_total', 'Ответы 429 API-сервиса'
+)
+API_THROTTLED = Counter(
+    'homework_api_throttled_total',
+    'Опросы, отложенные (deferred) или пропущенные (dropped) из-за лимитов',
+    ('scope', 'action')
+)
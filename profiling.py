@@ -0,0 +1,115 @@
+import cProfile
+import json
+import logging
+import os
+import signal
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from os import getenv
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TRACE = getenv('PROFILE_TRACE')
+PROFILE_DIR = getenv('PROFILE_DIR', '.')
+TRACEMALLOC_TOP = 50
+
+_trace = None
+_trace_lock = threading.Lock()
+_profiler = None
+
+
+def enable_tracing(path):
+    """Включает запись длительности этапов в JSONL-файл path."""
+    global _trace
+    with _trace_lock:
+        if _trace is not None:
+            _trace.close()
+        _trace = open(path, 'a', encoding='utf-8', buffering=1)
+
+
+def disable_tracing():
+    """Выключает запись этапов и закрывает файл."""
+    global _trace
+    with _trace_lock:
+        if _trace is not None:
+            _trace.close()
+            _trace = None
+
+
+@contextmanager
+def span(name, **fields):
+    """Записывает длительность блока with как этап name.
+
+    Если запись выключена, блок выполняется без замеров.
+    """
+    if _trace is None:
+        yield
+        return
+    started = time.time()
+    counter = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as exception:
+        error = type(exception).__name__
+        raise
+    finally:
+        record = {
+            'span': name,
+            'start': started,
+            'duration': time.perf_counter() - counter,
+            'thread': threading.current_thread().name,
+            **fields,
+        }
+        if error:
+            record['error'] = error
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with _trace_lock:
+            if _trace is not None:
+                _trace.write(line + '\n')
+
+
+def toggle_profiling(*args):
+    """Запускает cProfile и tracemalloc, при повторном вызове — сохраняет.
+
+    Профиль пишется в PROFILE_DIR/profile-<время>.prof, снимок памяти —
+    в PROFILE_DIR/tracemalloc-<время>.txt.
+
+    cProfile профилирует поток, в котором включен, то есть главный
+    поток с циклом событий. HTTP-запросы в потоках asyncio.to_thread
+    и Hedger, а также отправка в telegram из потоков MessageQueue в
+    профиль не попадают; их длительность видна в записи этапов
+    PROFILE_TRACE с полем thread. tracemalloc учитывает все потоки.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        logger.info('Профилирование запущено')
+        return
+
+    _profiler.disable()
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    profile_path = os.path.join(PROFILE_DIR, f'profile-{stamp}.prof')
+    _profiler.dump_stats(profile_path)
+    _profiler = None
+
+    memory_path = os.path.join(PROFILE_DIR, f'tracemalloc-{stamp}.txt')
+    statistics = tracemalloc.take_snapshot().statistics('lineno')
+    tracemalloc.stop()
+    with open(memory_path, 'w', encoding='utf-8') as file:
+        for line in statistics[:TRACEMALLOC_TOP]:
+            file.write(f'{line}\n')
+
+    logger.info('Профиль сохранен: %s, %s', profile_path, memory_path)
+
+
+def install_signal_handler(signum=getattr(signal, 'SIGUSR2', None)):
+    """Включает и выключает профилирование по сигналу (SIGUSR2)."""
+    if signum is None:
+        return
+    signal.signal(signum, toggle_profiling)
@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import threading
+import time
+from os import getenv
+
+from exceptions import ThrottledError
+from metrics import API_RATE_LIMITED
+from sender import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+API_BUDGET_WINDOW = float(getenv('API_BUDGET_WINDOW', 60))
+API_GLOBAL_BUDGET = float(getenv('API_GLOBAL_BUDGET', 600))
+API_TOKEN_BUDGET = float(getenv('API_TOKEN_BUDGET', 10))
+API_RATE_LIMIT_SCOPE = getenv('API_RATE_LIMIT_SCOPE', 'global')
+DEFAULT_RETRY_AFTER = 60
+
+GLOBAL = 'global'
+TOKEN = 'token'
+
+
+def pause_key(token):
+    """Ключ паузы токена в хранилище: хеш, а не сам токен."""
+    return 'token:' + hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+class QuotaManager:
+    """Бюджеты запросов к API-сервису: общий и на каждый токен.
+
+    Бюджет — число запросов за window секунд, 0 снимает ограничение.
+    Бюджеты считаются в памяти процесса. Ответ 429 приостанавливает
+    запросы на Retry-After секунд: все, если scope равен global (лимит
+    на IP), или только токена, если token. Если задан store, паузы
+    хранятся в нем и действуют на все процессы с той же базой; их
+    моменты считаются по clock, поэтому это должны быть часы time.time.
+    """
+
+    def __init__(self, budget=API_GLOBAL_BUDGET, token_budget=API_TOKEN_BUDGET,
+                 window=API_BUDGET_WINDOW, scope=API_RATE_LIMIT_SCOPE,
+                 clock=time.time, store=None):
+        self.window = window
+        self.token_budget = token_budget
+        self.scope = scope
+        self.clock = clock
+        self.store = store
+        self.bucket = self._bucket(budget)
+        self.token_buckets = {}
+        self.paused_until = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, budget):
+        if not budget:
+            return None
+        return TokenBucket(
+            budget / self.window, capacity=budget, clock=self.clock
+        )
+
+    def _token_bucket(self, token):
+        if token not in self.token_buckets:
+            self.token_buckets[token] = self._bucket(self.token_budget)
+        return self.token_buckets[token]
+
+    def _paused_until(self, token):
+        paused = {
+            GLOBAL: self.paused_until.get(GLOBAL, 0),
+            TOKEN: self.paused_until.get(token, 0),
+        }
+        if self.store is not None:
+            shared = self.store.paused_until(
+                (GLOBAL, pause_key(token))
+            )
+            paused[GLOBAL] = max(paused[GLOBAL], shared.get(GLOBAL, 0))
+            paused[TOKEN] = max(
+                paused[TOKEN], shared.get(pause_key(token), 0)
+            )
+        return paused
+
+    def _retry_in(self, token):
+        now = self.clock()
+        waits = [
+            (until - now, scope)
+            for scope, until in self._paused_until(token).items()
+        ]
+        for bucket, scope in (
+            (self.bucket, GLOBAL), (self._token_bucket(token), TOKEN)
+        ):
+            if bucket is not None:
+                waits.append((bucket.delay(), scope))
+        wait, scope = max(waits, key=lambda item: item[0])
+        return max(0, wait), scope
+
+    def retry_in(self, token):
+        """Через сколько секунд разрешен запрос токена и какой лимит мешает."""
+        with self.lock:
+            return self._retry_in(token)
+
+    def acquire(self, token):
+        """Списывает запрос из бюджетов или бросает ThrottledError."""
+        with self.lock:
+            wait, scope = self._retry_in(token)
+            if wait > 0:
+                raise ThrottledError(
+                    f'Исчерпан лимит запросов ({scope}), '
+                    f'повтор через {wait:.0f} с', wait, scope
+                )
+            for bucket in (self.bucket, self._token_bucket(token)):
+                if bucket is not None:
+                    bucket.take()
+
+    def try_acquire(self, token):
+        """Списывает запрос, если бюджеты позволяют; иначе возвращает False."""
+        try:
+            self.acquire(token)
+        except ThrottledError:
+            return False
+        return True
+
+    def throttle(self, token, retry_after=None):
+        """Приостанавливает запросы после ответа 429."""
+        pause = DEFAULT_RETRY_AFTER if retry_after is None else retry_after
+        key = GLOBAL if self.scope == GLOBAL else token
+        API_RATE_LIMITED.inc()
+        with self.lock:
+            until = max(self.paused_until.get(key, 0), self.clock() + pause)
+            self.paused_until[key] = until
+        if self.store is not None:
+            self.store.pause(
+                GLOBAL if key == GLOBAL else pause_key(key), until
+            )
+        logger.warning('Превышен лимит API-сервиса, пауза %s с', pause)
@@ -0,0 +1,40 @@
+import json
+import threading
+import time
+from os import getenv
+
+RECORD_TRAFFIC = getenv('RECORD_TRAFFIC')
+
+_record = None
+_record_lock = threading.Lock()
+
+
+def enable_recording(path):
+    """Включает запись ответов API-сервиса и отправок в JSONL-файл."""
+    global _record
+    with _record_lock:
+        if _record is not None:
+            _record.close()
+        _record = open(path, 'a', encoding='utf-8', buffering=1)
+
+
+def disable_recording():
+    """Выключает запись трафика и закрывает файл."""
+    global _record
+    with _record_lock:
+        if _record is not None:
+            _record.close()
+            _record = None
+
+
+def record(event, **fields):
+    """Записывает событие трафика, если запись включена."""
+    if _record is None:
+        return
+    line = json.dumps(
+        {'time': time.time(), 'event': event, **fields},
+        ensure_ascii=False, default=str
+    )
+    with _record_lock:
+        if _record is not None:
+            _record.write(line + '\n')
@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import builtins
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import exceptions
+from accounts import Account
+from engine import AccountPoller, Context
+from sender import SEPARATOR
+from storage import StateStore
+
+
+class VirtualClock:
+    """Часы, время которых задает воспроизведение записи."""
+
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        """Текущее виртуальное время."""
+        return self.now
+
+
+class CollectingQueue:
+    """Очередь отправки, которая только собирает сообщения."""
+
+    def __init__(self):
+        self.messages = []
+
+    def put(self, chat_id, message, outbox_id=None):
+        """Запоминает сообщение вместо отправки."""
+        self.messages.append((chat_id, message))
+
+    def depth(self):
+        """Очередь всегда пуста: сообщения никуда не отправляются."""
+        return 0
+
+
+class UnlimitedQuota:
+    """Бюджеты без ограничений: лимиты уже сказались на записи."""
+
+    def acquire(self, token):
+        """Запрос всегда разрешен."""
+
+    def throttle(self, token, retry_after=None):
+        """Ответ 429 из записи не приостанавливает воспроизведение."""
+
+    def retry_in(self, token):
+        """Ожидать не нужно."""
+        return 0, 'global'
+
+
+def error_class(name):
+    """Класс исключения по имени из записи."""
+    cls = getattr(exceptions, name, None) or getattr(builtins, name, None)
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        return cls
+    return Exception
+
+
+@dataclass
+class ReplayContext(Context):
+    """Контекст, в котором ответы API-сервиса берутся из записи."""
+
+    event: dict = field(default=None)
+
+    async def fetch(self, account, current_timestamp):
+        """Ответ или ошибка текущего события записи."""
+        if self.event['event'] == 'error':
+            raise error_class(self.event['type'])(self.event['message'])
+        return self.event['body']
+
+
+@dataclass
+class ReplayResult:
+    """Итоги воспроизведения записи."""
+
+    iterations: int
+    elapsed: float
+    virtual_elapsed: float
+    messages: list
+    recorded: list
+
+    def mismatches(self):
+        """Сообщения, которые есть только в записи или только в повторе."""
+        replayed = Counter(self.messages)
+        recorded = Counter(self.recorded)
+        return (
+            sum((replayed - recorded).values())
+            + sum((recorded - replayed).values())
+        )
+
+
+def load_events(path):
+    """События записи трафика в порядке времени."""
+    with open(path, encoding='utf-8') as file:
+        events = [json.loads(line) for line in file if line.strip()]
+    return sorted(events, key=lambda event: event['time'])
+
+
+async def replay(events, store=None):
+    """Прогоняет ответы из записи через обработку в виртуальном времени.
+
+    Каждое событие response или error — одна итерация опроса аккаунта
+    в момент, когда она была записана. Сообщения не отправляются, а
+    собираются для сравнения с записанными отправками.
+    """
+    store = store or StateStore(':memory:')
+    clock = VirtualClock(events[0]['time'] if events else 0)
+    context = ReplayContext(
+        queue=CollectingQueue(),
+        semaphore=asyncio.Semaphore(1),
+        clock=clock,
+        quota=UnlimitedQuota(),
+    )
+    pollers = {}
+    recorded = []
+    iterations = 0
+    started = time.perf_counter()
+
+    for event in events:
+        if event['event'] == 'send':
+            recorded.extend(
+                (str(event['chat_id']), message)
+                for message in event['text'].split(SEPARATOR)
+            )
+            continue
+        if event['event'] not in ('response', 'error'):
+            continue
+        clock.now = event['time']
+        name = event['account']
+        if name not in pollers:
+            account = Account(
+                name=name, token='', chat_id=str(event['chat_id'])
+            )
+            pollers[name] = AccountPoller(
+                account, context, store, event['from_date']
+            )
+        context.event = event
+        await pollers[name].step()
+        iterations += 1
+
+    return ReplayResult(
+        iterations=iterations,
+        elapsed=time.perf_counter() - started,
+        virtual_elapsed=(
+            events[-1]['time'] - events[0]['time'] if events else 0
+        ),
+        messages=[
+            (str(chat_id), message)
+            for chat_id, message in context.queue.messages
+        ],
+        recorded=recorded,
+    )
+
+
+def main():
+    """Воспроизведение записанного трафика бота в ускоренном времени."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('path', help='JSONL-файл, записанный RECORD_TRAFFIC')
+    args = parser.parse_args()
+
+    result = asyncio.run(replay(load_events(args.path)))
+    speed = result.iterations / result.elapsed if result.elapsed else 0
+    print(
+        f'Итераций: {result.iterations} за {result.elapsed:.3f} с '
+        f'({speed:.0f} в секунду), '
+        f'записано за {result.virtual_elapsed:.0f} с'
+    )
+    print(
+        f'Сообщений: {len(result.messages)}, в записи: '
+        f'{len(result.recorded)}, расхождений: {result.mismatches()}'
+    )
+
+
+if __name__ == '__main__':
+    main()
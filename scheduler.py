@@ -0,0 +1,114 @@
+import hashlib
+import math
+from os import getenv
+
+from homework import HOMEWORK_STATUSES, RETRY_TIME
+
+MIN_DELAY = float(getenv('POLL_MIN_DELAY', 60))
+MAX_DELAY = float(getenv('POLL_MAX_DELAY', 3 * 60 * 60))
+IDLE_DELAY = float(getenv('POLL_IDLE_DELAY', 30 * 60))
+POLL_TICK = float(getenv('POLL_TICK', 1))
+WHEEL_SLOTS = 512
+
+POLL_DELAYS = {
+    'reviewing': 2 * 60,
+    'rejected': RETRY_TIME,
+    'approved': 60 * 60,
+}
+
+if POLL_DELAYS.keys() != HOMEWORK_STATUSES.keys():
+    raise ValueError('POLL_DELAYS не совпадает со статусами HOMEWORK_STATUSES')
+
+
+def stable_hash(key):
+    """Хеш строки, одинаковый во всех процессах и запусках."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+def next_delay(status=None, failures=0):
+    """Интервал между запросами к API-сервису.
+
+    Пока работа на проверке, опрос идет чаще; если работ нет или
+    последняя принята — реже. После подряд идущих NoResponseError
+    интервал растет экспоненциально.
+    """
+    delay = POLL_DELAYS.get(status, IDLE_DELAY)
+    if failures:
+        delay *= 2 ** min(failures, 16)
+    return max(MIN_DELAY, min(delay, MAX_DELAY))
+
+
+def next_poll(key, interval, now):
+    """Момент следующего опроса в постоянной фазе аккаунта.
+
+    Моменты опроса аккаунта — phase + k * interval, где фаза зависит
+    только от ключа, поэтому аккаунты равномерно распределены по
+    интервалу и не просыпаются одновременно. Берется ближайший момент
+    не раньше чем через половину интервала.
+    """
+    return _phase_moment(key, interval, now + interval / 2)
+
+
+def first_poll(key, interval, now):
+    """Момент первого опроса аккаунта после запуска.
+
+    Ближайший момент в фазе аккаунта не раньше now: при старте
+    аккаунты опрашиваются в течение одного интервала, а не все сразу.
+    """
+    return _phase_moment(key, interval, now)
+
+
+def _phase_moment(key, interval, earliest):
+    phase = stable_hash(key) / 2 ** 64 * interval
+    return phase + math.ceil((earliest - phase) / interval) * interval
+
+
+class TimingWheel:
+    """Хешированное колесо таймеров.
+
+    Таймер попадает в ячейку номер тика срабатывания по модулю числа
+    ячеек; за тик просматривается одна ячейка. Добавление и отмена
+    стоят O(1), а каждый таймер просматривается раз за оборот колеса.
+    """
+
+    def __init__(self, tick=POLL_TICK, slots=WHEEL_SLOTS, start=0):
+        self.tick = tick
+        self.slots = [{} for _ in range(slots)]
+        self.positions = {}
+        self.current = math.floor(start / tick)
+
+    def __len__(self):
+        """Число запланированных таймеров."""
+        return len(self.positions)
+
+    def schedule(self, key, when):
+        """Планирует срабатывание key в момент when."""
+        self.cancel(key)
+        due = max(math.ceil(when / self.tick), self.current + 1)
+        slot = due % len(self.slots)
+        self.slots[slot][key] = due
+        self.positions[key] = slot
+
+    def cancel(self, key):
+        """Отменяет таймер key, если он запланирован."""
+        slot = self.positions.pop(key, None)
+        if slot is not None:
+            del self.slots[slot][key]
+
+    def advance(self, now):
+        """Сдвигает колесо к моменту now и возвращает сработавшие ключи."""
+        target = math.floor(now / self.tick)
+        steps = min(target - self.current, len(self.slots))
+        fired = []
+        for step in range(1, steps + 1):
+            slot = (self.current + step) % len(self.slots)
+            bucket = self.slots[slot]
+            ready = [key for key, due in bucket.items() if due <= target]
+            for key in ready:
+                del bucket[key]
+                del self.positions[key]
+            fired.extend(ready)
+        self.current = max(self.current, target)
+        return fired
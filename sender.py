@@ -0,0 +1,319 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from os import getenv
+
+from breaker import CircuitBreaker, acquire
+from exceptions import CircuitOpenError
+from homework import send_to_chat
+from metrics import ERRORS, MESSAGES_SENT
+from profiling import span
+from recorder import record
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_RATE = float(getenv('TELEGRAM_GLOBAL_RATE', 25))
+CHAT_RATE = float(getenv('TELEGRAM_CHAT_RATE', 1))
+COALESCE_WINDOW = float(getenv('TELEGRAM_COALESCE_WINDOW', 1))
+SEND_WORKERS = int(getenv('TELEGRAM_SEND_WORKERS', 4))
+MAX_ATTEMPTS = 3
+RETRY_DELAY = float(getenv('TELEGRAM_RETRY_DELAY', 1))
+CHAT_ERROR_CODES = (400, 403)
+CHAT_ERROR_NAMES = ('BadRequest', 'ChatMigrated', 'Forbidden')
+MAX_MESSAGE_LENGTH = 4096
+SEPARATOR = '\n\n'
+
+
+class TokenBucket:
+    """Ограничитель частоты: rate токенов в секунду, запас capacity."""
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay(self):
+        """Сколько секунд ждать до появления токена."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Забирает токен; возвращает False, если его пока нет."""
+        if self.delay():
+            return False
+        self.tokens -= 1
+        return True
+
+
+def retry_after(error):
+    """Пауза из ответа 429 telegram, если ошибка вызвана им."""
+    cause = error.args[0] if error.args else error
+    return getattr(cause, 'retry_after', None)
+
+
+def chat_error(error):
+    """Ошибка относится к чату, а не к telegram в целом.
+
+    Это ответы 400 и 403 (чат не найден, бот заблокирован) от
+    встроенного клиента и соответствующие исключения
+    python-telegram-bot; 401 означает неверный токен бота.
+    """
+    cause = error.args[0] if error.args else error
+    if getattr(cause, 'error_code', None) in CHAT_ERROR_CODES:
+        return True
+    name = type(cause).__name__
+    return name in CHAT_ERROR_NAMES or (
+        name == 'Unauthorized' and 'forbidden' in str(cause).lower()
+    )
+
+
+class MessageQueue:
+    """Очередь исходящих сообщений telegram.
+
+    Отправку выполняют фоновые потоки, поэтому опрос API не ждет
+    telegram. Сообщения одного чата уходят по порядку; пришедшие в
+    течение window секунд склеиваются в одно. Частота ограничена
+    общим и по-чатовым token bucket, на 429 отправка приостанавливается
+    на retry_after секунд. Пока разомкнут предохранитель telegram или
+    чата, сообщения копятся в очереди. Ошибки конкретного чата
+    размыкают только его предохранитель, и сообщения в такой чат
+    отбрасываются; после прочих сбоев отправка повторяется с
+    экспоненциальной паузой от RETRY_DELAY. Доставленные сообщения
+    удаляются из outbox, отброшенные переносятся в dead_letters.
+    """
+
+    def __init__(self, bot, rate=GLOBAL_RATE, chat_rate=CHAT_RATE,
+                 window=COALESCE_WINDOW, workers=SEND_WORKERS,
+                 clock=time.monotonic, breaker=None, outbox=None):
+        self.bot = bot
+        self.outbox = outbox
+        self.window = window
+        self.chat_rate = chat_rate
+        self.clock = clock
+        self.bucket = TokenBucket(rate, capacity=rate, clock=clock)
+        self.chat_buckets = {}
+        self.breaker = breaker or CircuitBreaker('telegram', clock=clock)
+        self.chat_breakers = {}
+        self.retry_at = {}
+        self.pending = OrderedDict()
+        self.in_flight = set()
+        self.paused_until = 0
+        self.closing = False
+        self.condition = threading.Condition()
+        self.threads = [
+            threading.Thread(target=self._work, daemon=True)
+            for _ in range(workers)
+        ]
+
+    def start(self):
+        """Запускает потоки отправки."""
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def put(self, chat_id, message, outbox_id=None):
+        """Ставит сообщение в очередь, не дожидаясь отправки."""
+        with self.condition:
+            if chat_id not in self.pending:
+                self.pending[chat_id] = (self.clock(), [])
+            self.pending[chat_id][1].append((message, 0, outbox_id))
+            self.condition.notify()
+
+    def depth(self):
+        """Число сообщений, ожидающих отправки."""
+        with self.condition:
+            return sum(len(items) for _, items in self.pending.values())
+
+    def close(self, timeout=None):
+        """Отправляет накопленное без ожидания окна и останавливает потоки.
+
+        Возвращает число сообщений, которые не успели уйти за timeout.
+        """
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        deadline = None if timeout is None else self.clock() + timeout
+        for thread in self.threads:
+            left = None if deadline is None else max(
+                0, deadline - self.clock()
+            )
+            thread.join(left)
+        return self.depth()
+
+    def _chat_bucket(self, chat_id):
+        if chat_id not in self.chat_buckets:
+            self.chat_buckets[chat_id] = TokenBucket(
+                self.chat_rate, clock=self.clock
+            )
+        return self.chat_buckets[chat_id]
+
+    def _chat_breaker(self, chat_id):
+        if chat_id not in self.chat_breakers:
+            self.chat_breakers[chat_id] = CircuitBreaker(
+                f'telegram:{chat_id}', clock=self.clock
+            )
+        return self.chat_breakers[chat_id]
+
+    def _next_batch(self):
+        """Выбирает готовый чат; иначе возвращает время ожидания."""
+        now = self.clock()
+        wait = max(self.paused_until - now, self.breaker.retry_in())
+        if wait > 0:
+            return None, wait
+        wait = None
+        for chat_id, (first, items) in self.pending.items():
+            if chat_id in self.in_flight:
+                continue
+            chat_breaker = self._chat_breaker(chat_id)
+            ready = 0 if self.closing else first + self.window - now
+            ready = max(
+                ready,
+                self._chat_bucket(chat_id).delay(),
+                chat_breaker.retry_in(),
+                self.retry_at.get(chat_id, 0) - now,
+            )
+            if ready <= 0:
+                global_wait = self.bucket.delay()
+                if global_wait:
+                    return None, global_wait
+                try:
+                    acquire(self.breaker, chat_breaker)
+                except CircuitOpenError:
+                    continue
+                self.bucket.take()
+                self._chat_bucket(chat_id).take()
+                return (chat_id, self._take_items(chat_id)), None
+            wait = ready if wait is None else min(wait, ready)
+        return None, wait
+
+    def _take_items(self, chat_id):
+        first, items = self.pending[chat_id]
+        batch = [items.pop(0)]
+        length = len(batch[0][0])
+        while items:
+            length += len(SEPARATOR) + len(items[0][0])
+            if length > MAX_MESSAGE_LENGTH:
+                break
+            batch.append(items.pop(0))
+        if items:
+            self.pending[chat_id] = (first, items)
+        else:
+            del self.pending[chat_id]
+        self.in_flight.add(chat_id)
+        return batch
+
+    def _requeue(self, chat_id, batch):
+        if chat_id in self.pending:
+            first, items = self.pending[chat_id]
+        else:
+            first, items = self.clock() - self.window, []
+        self.pending[chat_id] = (first, batch + items)
+        self.pending.move_to_end(chat_id, last=False)
+
+    def _mark_sent(self, ids):
+        ids = [outbox_id for outbox_id in ids if outbox_id is not None]
+        try:
+            self.outbox.mark_sent(ids)
+        except Exception as error:
+            logger.error('Не удалось отметить доставку в outbox: %s', error)
+
+    def _dead_letter(self, ids, error):
+        ids = [outbox_id for outbox_id in ids if outbox_id is not None]
+        try:
+            self.outbox.dead_letter(ids, error)
+        except Exception as error:
+            logger.error('Не удалось убрать уведомления из outbox: %s', error)
+
+    def _failed(self, chat_id, items, error):
+        """Учитывает сбой отправки; возвращает отброшенные сообщения.
+
+        Ошибка чата не исправится повтором, поэтому такие сообщения
+        отбрасываются сразу, остальные — после MAX_ATTEMPTS попыток.
+        """
+        permanent = chat_error(error)
+        self._chat_breaker(chat_id).failure()
+        if permanent:
+            self.breaker.success()
+        else:
+            self.breaker.failure()
+        logger.error(
+            'Не удалось отправить сообщение в чат %s: %s', chat_id, error
+        )
+        retry, dropped = [], []
+        for message, attempts, outbox_id in items:
+            if permanent or attempts + 1 >= MAX_ATTEMPTS:
+                dropped.append((message, attempts + 1, outbox_id))
+            else:
+                retry.append((message, attempts + 1, outbox_id))
+        if retry:
+            attempts = max(item[1] for item in retry)
+            self.retry_at[chat_id] = (
+                self.clock() + RETRY_DELAY * 2 ** (attempts - 1)
+            )
+            self._requeue(chat_id, retry)
+        if dropped:
+            logger.error(
+                'Сообщения в чат %s отброшены: %s', chat_id, len(dropped)
+            )
+        return dropped
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while True:
+                    if self.closing and not self.pending:
+                        return
+                    batch, wait = self._next_batch()
+                    if batch:
+                        break
+                    self.condition.wait(wait)
+            chat_id, items = batch
+            self._send(chat_id, items)
+            with self.condition:
+                self.in_flight.discard(chat_id)
+                self.condition.notify_all()
+
+    def _send(self, chat_id, items):
+        text = SEPARATOR.join(message for message, _, _ in items)
+        breakers = (self.breaker, self._chat_breaker(chat_id))
+        try:
+            with span('send', chat_id=chat_id, messages=len(items)):
+                send_to_chat(self.bot, chat_id, text)
+        except Exception as error:
+            ERRORS.inc(type=type(error).__name__)
+            pause = retry_after(error)
+            with self.condition:
+                if pause is not None:
+                    for breaker in breakers:
+                        breaker.release()
+                    logger.warning(
+                        'Превышен лимит telegram, пауза %s с', pause
+                    )
+                    self.paused_until = self.clock() + pause
+                    self._requeue(chat_id, items)
+                    return
+                dropped = self._failed(chat_id, items, error)
+            if dropped and self.outbox is not None:
+                self._dead_letter((item[2] for item in dropped), error)
+            return
+        for breaker in breakers:
+            breaker.success()
+        with self.condition:
+            self.retry_at.pop(chat_id, None)
+        if self.outbox is not None:
+            self._mark_sent(item[2] for item in items)
+        MESSAGES_SENT.inc()
+        record('send', chat_id=chat_id, text=text)
+        logger.info('Отправлено сообщение в чат telegram.')
@@ -0,0 +1,113 @@
+import sys
+from datetime import datetime, timezone
+from enum import Enum
+
+from homework import HOMEWORK_STATUSES
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+class Status(str, Enum):
+    """Статус проверки работы; равен своей строке из ответа API."""
+
+    REVIEWING = 'reviewing'
+    REJECTED = 'rejected'
+    APPROVED = 'approved'
+
+    def __str__(self):
+        """Строковое значение статуса, как в ответе API."""
+        return self.value
+
+
+STATUSES = {status.value: status for status in Status}
+
+if STATUSES.keys() != HOMEWORK_STATUSES.keys():
+    raise ValueError('STATUSES не совпадает со статусами HOMEWORK_STATUSES')
+
+
+def intern_status(status):
+    """Общий для всех работ объект статуса вместо копии строки.
+
+    Известные статусы заменяются членами Status, неизвестные строки
+    интернируются, прочие значения возвращаются как есть.
+    """
+    if not isinstance(status, str):
+        return status
+    return STATUSES.get(status) or sys.intern(str(status))
+
+
+def homework_key(homework):
+    """Ключ домашней работы: id, а при его отсутствии — название."""
+    if not isinstance(homework, dict):
+        return None
+    key = homework.get('id', homework.get('homework_name'))
+    return None if key is None else str(key)
+
+
+def updated_at(homework):
+    """Время последнего изменения работы или None, если его нет."""
+    try:
+        return datetime.strptime(
+            homework['date_updated'], DATE_FORMAT
+        ).replace(tzinfo=timezone.utc).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class StatusTable:
+    """Последние известные статусы домашних работ одного аккаунта.
+
+    Статусы хранятся интернированными, поэтому на работу приходится
+    только ключ и ссылка на общий объект статуса.
+    """
+
+    def __init__(self, statuses=None):
+        self.statuses = {
+            key: intern_status(status)
+            for key, status in (statuses or {}).items()
+        }
+        self.dirty = set()
+        self.last_status = None
+
+    def changes(self, homeworks):
+        """Работы из ответа, статус которых отличается от известного.
+
+        Если работа встречается в ответе несколько раз, учитывается
+        первое вхождение. Записи без ключа возвращаются как есть, чтобы
+        parse_status сообщил об ошибке.
+        """
+        seen = set()
+        changed = []
+        for homework in homeworks:
+            key = homework_key(homework)
+            if key is None:
+                changed.append(homework)
+                continue
+            if key in seen:
+                continue
+            seen.add(key)
+            if self.statuses.get(key) != homework.get('status'):
+                changed.append(homework)
+        return changed
+
+    def apply(self, homework):
+        """Запоминает статус работы и возвращает предыдущий."""
+        key = homework_key(homework)
+        status = intern_status(homework.get('status'))
+        previous = self.statuses.get(key)
+        self.statuses[key] = status
+        self.dirty.add(key)
+        self.last_status = status
+        return previous
+
+    def pop_dirty(self):
+        """Статусы, изменившиеся с прошлого вызова, для сохранения."""
+        dirty = {key: self.statuses[key] for key in self.dirty}
+        self.dirty.clear()
+        return dirty
+
+    def current_status(self):
+        """Статус, по которому выбирается пауза до следующего запроса."""
+        if Status.REVIEWING in self.statuses.values():
+            return Status.REVIEWING
+        return self.last_status
@@ -0,0 +1,210 @@
+import sqlite3
+import threading
+from os import getenv
+
+STATE_DB = getenv('STATE_DB', 'state.sqlite3')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cursors (
+    account TEXT PRIMARY KEY,
+    from_date INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS statuses (
+    account TEXT NOT NULL,
+    homework TEXT NOT NULL,
+    status TEXT,
+    PRIMARY KEY (account, homework)
+);
+CREATE TABLE IF NOT EXISTS analytics (
+    account TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    account TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dead_letters (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    error TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pauses (
+    scope TEXT PRIMARY KEY,
+    until REAL NOT NULL
+);
+'''
+
+
+class StateStore:
+    """Хранит курсор from_date и статусы работ аккаунтов в SQLite.
+
+    Курсор, статусы и уведомления одной итерации записываются одной
+    транзакцией, поэтому после падения процесса состояние не бывает
+    рассогласованным. Уведомления лежат в outbox, пока telegram не
+    подтвердит отправку.
+    """
+
+    def __init__(self, path=STATE_DB):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def load(self, account):
+        """Возвращает курсор и статусы работ аккаунта."""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT from_date FROM cursors WHERE account = ?', (account,)
+            ).fetchone()
+            statuses = dict(self.connection.execute(
+                'SELECT homework, status FROM statuses WHERE account = ?',
+                (account,)
+            ))
+        return (row[0] if row else None), statuses
+
+    def load_analytics(self, account):
+        """Снимок статистики проверок аккаунта или None."""
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT data FROM analytics WHERE account = ?', (account,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, account, from_date=None, statuses=None, analytics=None,
+             messages=None):
+        """Атомарно записывает курсор, статусы, статистику и уведомления.
+
+        messages — пары (chat_id, текст) для outbox; возвращаются
+        номера записей outbox в том же порядке.
+        """
+        if (
+            from_date is None and not statuses and analytics is None
+            and not messages
+        ):
+            return []
+        ids = []
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                if from_date is not None:
+                    self.connection.execute(
+                        'INSERT INTO cursors (account, from_date) '
+                        'VALUES (?, ?) ON CONFLICT (account) '
+                        'DO UPDATE SET from_date = excluded.from_date',
+                        (account, from_date)
+                    )
+                if statuses:
+                    self.connection.executemany(
+                        'INSERT INTO statuses (account, homework, status) '
+                        'VALUES (?, ?, ?) ON CONFLICT (account, homework) '
+                        'DO UPDATE SET status = excluded.status',
+                        [(account, key, status)
+                         for key, status in statuses.items()]
+                    )
+                if analytics is not None:
+                    self.connection.execute(
+                        'INSERT INTO analytics (account, data) '
+                        'VALUES (?, ?) ON CONFLICT (account) '
+                        'DO UPDATE SET data = excluded.data',
+                        (account, analytics)
+                    )
+                for chat_id, message in messages or ():
+                    ids.append(self.connection.execute(
+                        'INSERT INTO outbox (account, chat_id, message) '
+                        'VALUES (?, ?, ?)',
+                        (account, str(chat_id), message)
+                    ).lastrowid)
+            except Exception:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+        return ids
+
+    def pending_messages(self, accounts):
+        """Неподтвержденные уведомления аккаунтов: (номер, chat_id, текст).
+
+        Процесс берет только уведомления своих аккаунтов, чтобы не
+        отправить повторно то, что еще отправляет другой процесс.
+        """
+        accounts = list(accounts)
+        if not accounts:
+            return []
+        placeholders = ', '.join('?' * len(accounts))
+        with self.lock:
+            return self.connection.execute(
+                'SELECT id, chat_id, message FROM outbox '
+                f'WHERE account IN ({placeholders}) ORDER BY id',
+                accounts
+            ).fetchall()
+
+    def mark_sent(self, ids):
+        """Удаляет из outbox уведомления, доставленные в telegram."""
+        ids = list(ids)
+        if not ids:
+            return
+        placeholders = ', '.join('?' * len(ids))
+        with self.lock:
+            self.connection.execute(
+                f'DELETE FROM outbox WHERE id IN ({placeholders})', ids
+            )
+
+    def dead_letter(self, ids, error):
+        """Переносит из outbox уведомления, которые не будут доставлены.
+
+        Такие уведомления больше не повторяются при запуске, но остаются
+        в таблице dead_letters вместе с текстом ошибки.
+        """
+        ids = list(ids)
+        if not ids:
+            return
+        placeholders = ', '.join('?' * len(ids))
+        with self.lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO dead_letters '
+                    '(id, account, chat_id, message, error) '
+                    'SELECT id, account, chat_id, message, ? FROM outbox '
+                    f'WHERE id IN ({placeholders})',
+                    [str(error), *ids]
+                )
+                self.connection.execute(
+                    f'DELETE FROM outbox WHERE id IN ({placeholders})', ids
+                )
+            except Exception:
+                self.connection.execute('ROLLBACK')
+                raise
+            self.connection.execute('COMMIT')
+
+    def pause(self, scope, until):
+        """Запоминает паузу запросов scope до момента until (time.time)."""
+        with self.lock:
+            self.connection.execute(
+                'INSERT INTO pauses (scope, until) VALUES (?, ?) '
+                'ON CONFLICT (scope) '
+                'DO UPDATE SET until = MAX(until, excluded.until)',
+                (scope, until)
+            )
+
+    def paused_until(self, scopes):
+        """Моменты окончания пауз для scopes, общие для всех процессов."""
+        scopes = list(scopes)
+        placeholders = ', '.join('?' * len(scopes))
+        with self.lock:
+            return dict(self.connection.execute(
+                'SELECT scope, until FROM pauses '
+                f'WHERE scope IN ({placeholders})',
+                scopes
+            ))
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self.lock:
+            self.connection.close()
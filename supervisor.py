@@ -0,0 +1,192 @@
+import bisect
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from os import getenv
+
+import homework
+from accounts import ACCOUNTS_FILE, load_accounts
+from logging_setup import configure_logging
+from scheduler import stable_hash
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(getenv('WORKERS', os.cpu_count() or 1))
+VIRTUAL_NODES = 64
+CHECK_INTERVAL = float(getenv('SUPERVISOR_CHECK_INTERVAL', 5))
+STOP_TIMEOUT = float(getenv('SUPERVISOR_STOP_TIMEOUT', 30))
+MAX_RESTART_DELAY = 60
+
+
+class HashRing:
+    """Консистентное хеширование аккаунтов по процессам.
+
+    При изменении числа процессов переезжает только часть аккаунтов.
+    """
+
+    def __init__(self, nodes, replicas=VIRTUAL_NODES):
+        self.ring = sorted(
+            (stable_hash(f'{node}:{replica}'), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        self.hashes = [point for point, _ in self.ring]
+
+    def node(self, key):
+        """Процесс, которому принадлежит ключ."""
+        index = bisect.bisect(self.hashes, stable_hash(key))
+        return self.ring[index % len(self.ring)][1]
+
+
+def partition(accounts, workers):
+    """Распределяет аккаунты по номерам процессов."""
+    ring = HashRing(range(workers))
+    shards = {worker: [] for worker in range(workers)}
+    for account in accounts:
+        shards[ring.node(account.name)].append(account)
+    return shards
+
+
+def worker_main(worker, accounts, workers):
+    """Точка входа процесса: опрашивает свою долю аккаунтов."""
+    from engine import serve
+
+    configure_logging()
+    serve(accounts, worker=worker, workers=workers)
+
+
+class Supervisor:
+    """Запускает процессы опроса и следит за ними.
+
+    Упавшие процессы перезапускаются, при изменении файла аккаунтов
+    аккаунты перераспределяются. Аккаунт всегда опрашивается одним
+    процессом: при перераспределении затронутые процессы сначала
+    останавливаются, затем запускаются с новым набором аккаунтов.
+    """
+
+    def __init__(self, path, workers=WORKERS, check_interval=CHECK_INTERVAL,
+                 stop_timeout=STOP_TIMEOUT):
+        self.path = path
+        self.workers = workers
+        self.check_interval = check_interval
+        self.stop_timeout = stop_timeout
+        self.context = multiprocessing.get_context('spawn')
+        self.shards = {}
+        self.processes = {}
+        self.restarts = {}
+        self.accounts_mtime = None
+        self.stopping = False
+
+    def load(self):
+        """Читает аккаунты, если файл изменился; иначе возвращает None."""
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self.accounts_mtime:
+            return None
+        accounts = load_accounts(self.path)
+        self.accounts_mtime = mtime
+        return accounts
+
+    def spawn(self, worker):
+        """Запускает процесс для доли worker."""
+        process = self.context.Process(
+            target=worker_main,
+            args=(worker, self.shards[worker], self.workers),
+            name=f'homework-worker-{worker}', daemon=False
+        )
+        process.start()
+        self.processes[worker] = process
+        logger.info(
+            'Процесс %s запущен, аккаунтов: %s', worker,
+            len(self.shards[worker])
+        )
+
+    def terminate(self, workers):
+        """Останавливает процессы через SIGTERM, по истечении срока — kill."""
+        processes = [
+            self.processes.pop(worker) for worker in workers
+            if worker in self.processes
+        ]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.error('Процесс %s не остановился, kill', process.name)
+                process.kill()
+                process.join()
+
+    def rebalance(self, accounts):
+        """Перезапускает только процессы, чей набор аккаунтов изменился."""
+        shards = partition(accounts, self.workers)
+        changed = [
+            worker for worker, shard in shards.items()
+            if shard != self.shards.get(worker, [])
+        ]
+        self.terminate(changed)
+        self.shards = shards
+        for worker in changed:
+            self.restarts.pop(worker, None)
+            if shards[worker]:
+                self.spawn(worker)
+        if changed:
+            logger.info('Перераспределены процессы: %s', changed)
+
+    def check(self):
+        """Перезапускает упавшие процессы с экспоненциальной паузой."""
+        now = time.monotonic()
+        for worker, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            failures, restart_at = self.restarts.get(worker, (0, None))
+            if restart_at is None:
+                delay = min(MAX_RESTART_DELAY, 2 ** failures)
+                logger.error(
+                    'Процесс %s завершился с кодом %s, перезапуск через %s с',
+                    worker, process.exitcode, delay
+                )
+                self.restarts[worker] = (failures + 1, now + delay)
+            elif now >= restart_at:
+                self.restarts[worker] = (failures, None)
+                self.spawn(worker)
+
+    def stop(self, *args):
+        """Останавливает супервизор и все процессы."""
+        self.stopping = True
+
+    def run(self):
+        """Основной цикл супервизора."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        try:
+            while not self.stopping:
+                try:
+                    accounts = self.load()
+                except Exception as error:
+                    logger.error('Не удалось прочитать аккаунты: %s', error)
+                    accounts = None
+                if accounts is not None:
+                    self.rebalance(accounts)
+                self.check()
+                time.sleep(self.check_interval)
+        finally:
+            logger.info('Остановка процессов')
+            self.terminate(list(self.processes))
+
+
+def main():
+    """Запуск опроса аккаунтов в нескольких процессах."""
+    if not ACCOUNTS_FILE:
+        sys.exit('Для запуска нескольких процессов укажите ACCOUNTS_FILE')
+    if not homework.TELEGRAM_TOKEN:
+        sys.exit('Не хватает токена telegram')
+    Supervisor(ACCOUNTS_FILE).run()
+
+
+if __name__ == '__main__':
+    configure_logging()
+    main()
@@ -0,0 +1,43 @@
+from alerts import ErrorDigest, fingerprint
+from exceptions import NoResponseError
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000198000
+
+    def __call__(self):
+        return self.now
+
+
+class TestAlerts:
+
+    def test_fingerprint_ignores_volatile_parts(self):
+        first = NoResponseError('Read timed out. (read timeout=30)')
+        second = NoResponseError('Read timed out. (read timeout=5.5)')
+
+        assert fingerprint(first) == fingerprint(second)
+        assert fingerprint(first) != fingerprint(KeyError('timeout=30'))
+
+    def test_repeats_are_suppressed_and_digested(self):
+        clock = FakeClock()
+        alerts = ErrorDigest(window=600, digest_interval=3600, clock=clock)
+
+        assert alerts.record(NoResponseError('code 500'), 'Сбой: 500')
+        for code in (502, 503, 500):
+            clock.now += 60
+            assert not alerts.record(
+                NoResponseError(f'code {code}'), f'Сбой: {code}'
+            ), 'Повтор ошибки в пределах окна должен подавляться'
+        assert alerts.record(KeyError('homeworks'), 'Сбой: homeworks')
+        assert alerts.digest() is None
+
+        clock.now += 3600
+        digest = alerts.digest()
+
+        assert 'Сбой: 500 — повторов: 3' in digest
+        assert 'homeworks' not in digest
+        assert alerts.record(NoResponseError('code 500'), 'Сбой: 500'), (
+            'После окна ошибка должна отправляться снова'
+        )
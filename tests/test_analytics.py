@@ -0,0 +1,77 @@
+from analytics import Analytics, DurationHistogram
+
+
+def homework(status, date_updated, name='hw1', lesson='Итоговый проект'):
+    return {
+        'id': name,
+        'homework_name': name,
+        'status': status,
+        'lesson_name': lesson,
+        'date_updated': date_updated,
+    }
+
+
+class TestAnalytics:
+
+    def test_histogram_quantiles(self):
+        histogram = DurationHistogram()
+        for minutes in range(1, 101):
+            histogram.add(minutes * 60)
+
+        median = histogram.quantile(0.5)
+
+        assert 50 * 60 <= median <= 50 * 60 * 1.25, (
+            'Оценка перцентиля должна отличаться не больше чем на шаг корзины'
+        )
+        assert histogram.mean() == 50.5 * 60
+
+    def test_transitions(self):
+        analytics = Analytics()
+        analytics.record(homework('reviewing', '2020-02-13T10:00:00Z'))
+        analytics.record(
+            homework('rejected', '2020-02-13T12:00:00Z'), 'reviewing'
+        )
+        analytics.record(
+            homework('reviewing', '2020-02-14T10:00:00Z'), 'rejected'
+        )
+        analytics.record(
+            homework('approved', '2020-02-14T11:00:00Z'), 'reviewing'
+        )
+
+        total = analytics.stats['all']
+        assert (total.approved, total.rejected) == (1, 1)
+        assert total.durations.count == 2
+        assert total.durations.total == 3 * 60 * 60
+        assert analytics.rejections == {'hw1': 1}
+        assert 'project:Итоговый проект' in analytics.stats
+
+    def test_json_roundtrip(self):
+        analytics = Analytics()
+        analytics.record(homework('reviewing', '2020-02-13T10:00:00Z'))
+        analytics.record(
+            homework('approved', '2020-02-13T12:00:00Z'), 'reviewing'
+        )
+
+        restored = Analytics.from_json(analytics.to_json())
+
+        assert restored.summary() == analytics.summary()
+        assert 'Проверено: 1 (принято 1, с замечаниями 0)' in (
+            restored.summary()
+        )
+
+    def test_snapshots_are_throttled(self):
+        analytics = Analytics()
+        assert analytics.snapshot(0) is None, 'Без изменений снимок не нужен'
+
+        analytics.record(homework('reviewing', '2020-02-13T10:00:00Z'))
+        assert analytics.snapshot(1000, interval=300) is not None
+
+        analytics.record(
+            homework('approved', '2020-02-13T12:00:00Z'), 'reviewing'
+        )
+        assert analytics.snapshot(1100, interval=300) is None, (
+            'Снимки не должны писаться чаще раза в interval секунд'
+        )
+        snapshot = analytics.snapshot(1300, interval=300)
+        assert Analytics.from_json(snapshot).summary() == analytics.summary()
+        assert analytics.snapshot(2000, interval=300) is None
@@ -0,0 +1,105 @@
+import json
+
+import requests
+
+from accounts import Account
+from backfill import backfill
+from quota import QuotaManager
+from storage import StateStore
+
+HOMEWORKS = [
+    {'id': 1, 'status': 'approved', 'homework_name': 'hw1',
+     'date_updated': '2020-03-01T10:00:00Z'},
+    {'id': 1, 'status': 'reviewing', 'homework_name': 'hw1',
+     'date_updated': '2020-02-01T10:00:00Z'},
+    {'id': 2, 'status': 'rejected', 'homework_name': 'hw2',
+     'date_updated': '2020-01-10T10:00:00Z'},
+]
+
+
+class MockResponse:
+
+    def __init__(self, homeworks=HOMEWORKS, status_code=200, headers=None):
+        self.homeworks = homeworks
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size):
+        body = json.dumps(
+            {'homeworks': self.homeworks, 'current_date': 1583100000}
+        ).encode()
+        for start in range(0, len(body), 7):
+            yield body[start:start + 7]
+
+    def close(self):
+        pass
+
+
+class TestBackfill:
+
+    def test_backfill(self, monkeypatch):
+        requested = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            requested.append(params['from_date'])
+            return MockResponse()
+
+        monkeypatch.setattr(requests.Session, 'get', mock_get)
+        store = StateStore(':memory:')
+        accounts = [
+            Account(name='student', token='token', chat_id='1'),
+            Account(name='other', token='other', chat_id='2'),
+        ]
+
+        failed = backfill(
+            accounts, store, since=1577836800, batch=1, workers=4
+        )
+
+        assert failed == 0
+        assert requested == [1577836800, 1577836800], (
+            'История аккаунта должна загружаться одним запросом'
+        )
+        assert store.load('student') == (
+            1583100000, {'1': 'approved', '2': 'rejected'}
+        ), 'Из нескольких записей должен сохраняться последний статус работы'
+
+    def test_backfill_rejects_null_homeworks(self, monkeypatch):
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: MockResponse(homeworks=None)
+        )
+        store = StateStore(':memory:')
+        account = Account(name='student', token='token', chat_id='1')
+
+        assert backfill([account], store, since=1577836800) == 1
+        assert store.load('student') == (None, {}), (
+            'Ответ без списка работ не должен ставить курсор'
+        )
+
+    def test_backfill_respects_quota(self, monkeypatch):
+        now = [0]
+        responses = [
+            MockResponse(status_code=429, headers={'Retry-After': '30'})
+        ]
+        requested = []
+
+        def mock_get(session, url, params=None, **kwargs):
+            requested.append(now[0])
+            return responses.pop(0) if responses else MockResponse()
+
+        monkeypatch.setattr(requests.Session, 'get', mock_get)
+        monkeypatch.setattr(
+            'backfill.time.sleep',
+            lambda seconds: now.__setitem__(0, now[0] + seconds)
+        )
+        quota = QuotaManager(token_budget=1, window=10, clock=lambda: now[0])
+        store = StateStore(':memory:')
+        accounts = [
+            Account(name='student', token='token', chat_id='1'),
+            Account(name='other', token='token', chat_id='2'),
+        ]
+
+        assert backfill(accounts, store, workers=1, quota=quota) == 0
+        assert requested == [0, 30, 40], (
+            'Загрузка должна выжидать Retry-After и бюджет токена'
+        )
@@ -186,7 +186,7 @@ class TestHomework:
                 current_timestamp=current_timestamp, **kwargs
             )
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_response_get))
 
         import homework
 
@@ -232,7 +232,7 @@ class TestHomework:
             response.json = json_invalid
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_500_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_500_response_get))
 
         import homework
 
@@ -315,7 +315,7 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_response_get))
 
         import homework
 
@@ -352,7 +352,7 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_response_get))
 
         import homework
 
@@ -400,7 +400,7 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_response_get))
 
         import homework
 
@@ -448,7 +448,7 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_response_get))
 
         import homework
 
@@ -484,7 +484,7 @@ class TestHomework:
             response.json = json_invalid
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_no_homeworks_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_no_homeworks_response_get))
 
         import homework
 
@@ -525,7 +525,7 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_response_get))
 
         import homework
 
@@ -565,7 +565,7 @@ class TestHomework:
             response.json = valid_response_json
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_response_get))
 
         import homework
 
@@ -599,7 +599,7 @@ class TestHomework:
             response.json = json_invalid
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_empty_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_empty_response_get))
 
         import homework
 
@@ -626,7 +626,7 @@ class TestHomework:
             )
             return response
 
-        monkeypatch.setattr(requests, 'get', mock_response_get)
+        monkeypatch.setattr(requests.Session, 'get', utils.session_get(mock_response_get))
 
         import homework
 
@@ -0,0 +1,69 @@
+import pytest
+import requests
+
+from bot_api import BotApiClient, create_bot
+from exceptions import RetryAfterError, TelegramApiError
+from sender import retry_after
+
+
+class MockResponsePOST:
+
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.data = data
+        self.headers = {}
+
+    def json(self):
+        return self.data
+
+
+class TestBotApi:
+
+    def mock_post(self, monkeypatch, status_code, data):
+        calls = []
+
+        def post(session, url, **kwargs):
+            calls.append((url, kwargs))
+            return MockResponsePOST(status_code, data)
+
+        monkeypatch.setattr(requests.Session, 'post', post)
+        return calls
+
+    def test_send_message(self, monkeypatch):
+        calls = self.mock_post(
+            monkeypatch, 200, {'ok': True, 'result': {'message_id': 1}}
+        )
+
+        result = BotApiClient('1234:abcdefg').send_message(12345, 'text')
+
+        assert result == {'message_id': 1}
+        url, kwargs = calls[0]
+        assert url == 'https://api.telegram.org/bot1234:abcdefg/sendMessage'
+        assert kwargs['json'] == {'chat_id': 12345, 'text': 'text'}
+        assert 'timeout' in kwargs
+
+    def test_retry_after(self, monkeypatch):
+        self.mock_post(monkeypatch, 429, {
+            'ok': False,
+            'description': 'Too Many Requests: retry after 7',
+            'parameters': {'retry_after': 7},
+        })
+
+        with pytest.raises(RetryAfterError) as error:
+            BotApiClient('1234:abcdefg').send_message(12345, 'text')
+
+        assert retry_after(Exception(error.value)) == 7
+
+    def test_api_error(self, monkeypatch):
+        self.mock_post(monkeypatch, 400, {
+            'ok': False, 'description': 'Bad Request: chat not found'
+        })
+
+        with pytest.raises(TelegramApiError, match='chat not found'):
+            BotApiClient('1234:abcdefg').send_message(12345, 'text')
+
+    def test_default_backend(self):
+        bot = create_bot('1234:abcdefg')
+
+        assert isinstance(bot, BotApiClient)
+        assert 'abcdefg' not in repr(bot)
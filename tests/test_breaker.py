@@ -0,0 +1,71 @@
+import pytest
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, acquire
+from exceptions import CircuitOpenError
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            'api', failure_threshold=2, probe_interval=60, clock=clock
+        )
+
+        breaker.failure()
+        assert breaker.allow()
+        breaker.failure()
+
+        assert breaker.state == OPEN
+        assert not breaker.allow(), (
+            'Разомкнутый предохранитель не должен пропускать вызовы'
+        )
+        assert breaker.retry_in() == 60
+
+    def test_half_open_probe(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(
+            'api', failure_threshold=1, probe_interval=60, clock=clock
+        )
+        breaker.failure()
+        clock.now = 60
+
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow(), 'Пробный вызов должен быть один'
+
+        breaker.failure()
+        assert breaker.state == OPEN
+
+        clock.now = 120
+        assert breaker.allow()
+        breaker.success()
+        assert breaker.state == CLOSED
+
+    def test_acquire_is_all_or_nothing(self):
+        clock = FakeClock()
+        first = CircuitBreaker(
+            'first', failure_threshold=1, probe_interval=60, clock=clock
+        )
+        second = CircuitBreaker(
+            'second', failure_threshold=1, probe_interval=120, clock=clock
+        )
+        first.failure()
+        second.failure()
+        clock.now = 60
+
+        with pytest.raises(CircuitOpenError):
+            acquire(first, second)
+
+        assert first.allow(), (
+            'Пробный вызов должен вернуться, если вызов не состоялся'
+        )
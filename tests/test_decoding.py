@@ -0,0 +1,81 @@
+import json
+import sys
+
+import pytest
+
+from decoding import HomeworkStream, decode_response, load_backend
+
+
+def chunked(document, size):
+    body = json.dumps(document, ensure_ascii=False).encode()
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+class MockResponse:
+
+    def __init__(self, content):
+        self.content = content
+
+    def json(self):
+        raise AssertionError('Должен использоваться бэкенд JSON')
+
+
+class TestDecoding:
+
+    def test_backend_fallback(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'ujson', None)
+        assert load_backend('ujson')[0] == 'json', (
+            'Неустановленный бэкенд должен заменяться стандартным json'
+        )
+        name, loads = load_backend('auto')
+        assert loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+
+    def test_unknown_backend_is_rejected(self):
+        for name in ('pickle', 'os', 'missing_json_backend'):
+            with pytest.raises(ValueError):
+                load_backend(name)
+
+    def test_decode_response(self):
+        response = MockResponse('{"current_date": 1}'.encode())
+
+        assert decode_response(response) == {'current_date': 1}
+
+    @pytest.mark.parametrize('size', [1, 3, 64 * 1024])
+    def test_stream_homeworks(self, size):
+        homeworks = [
+            {'id': number, 'homework_name': f'работа {number}',
+             'status': 'approved', 'score': 1.5e3}
+            for number in range(50)
+        ]
+        stream = HomeworkStream(chunked(
+            {'homeworks': homeworks, 'current_date': 1234567890}, size
+        ))
+
+        assert list(stream) == homeworks, (
+            'Работы должны разбираться одинаково при любом размере фрагментов'
+        )
+        assert stream.fields == {'homeworks': [], 'current_date': 1234567890}
+
+    def test_stream_keeps_other_fields(self):
+        stream = HomeworkStream(chunked(
+            {'current_date': 1, 'homeworks': [], 'extra': {'a': [1]}}, 2
+        ))
+
+        assert list(stream) == []
+        assert stream.fields['extra'] == {'a': [1]}
+
+    def test_stream_keeps_null_homeworks(self):
+        stream = HomeworkStream(chunked(
+            {'homeworks': None, 'current_date': 1}, 3
+        ))
+
+        assert list(stream) == []
+        assert stream.fields['homeworks'] is None, (
+            'null вместо списка работ не должен подменяться пустым списком'
+        )
+
+    def test_stream_rejects_truncated_body(self):
+        stream = HomeworkStream([b'{"homeworks": [{"id": 1}, {"id"'])
+
+        with pytest.raises(ValueError):
+            list(stream)
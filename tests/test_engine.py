@@ -0,0 +1,324 @@
+import asyncio
+import json
+import os
+import signal
+
+import pytest
+import requests
+
+from accounts import Account, load_accounts
+
+
+class MockResponse:
+    status_code = 200
+
+    def __init__(self, status='approved'):
+        self.status = status
+
+    def json(self):
+        return {
+            'homeworks': [{'homework_name': 'hw123', 'status': self.status}],
+            'current_date': 1000198000,
+        }
+
+
+class MockBot:
+
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class MockQueue:
+
+    def __init__(self):
+        self.messages = []
+
+    def put(self, chat_id, message, outbox_id=None):
+        self.messages.append(message)
+
+
+class TestEngine:
+
+    def test_load_accounts(self, tmp_path):
+        path = tmp_path / 'accounts.json'
+        path.write_text(json.dumps([
+            {'name': 'first', 'practicum_token': 'token1', 'chat_id': 1},
+            {'practicum_token': 'token2', 'chat_id': 2},
+        ]))
+
+        accounts = load_accounts(path)
+
+        assert [account.name for account in accounts] == ['first', '1']
+        assert accounts[0].headers == {'Authorization': 'OAuth token1'}
+        assert accounts[1].chat_id == '2'
+
+    def test_load_accounts_without_token(self, tmp_path):
+        path = tmp_path / 'accounts.json'
+        path.write_text(json.dumps([{'name': 'first', 'chat_id': 1}]))
+
+        with pytest.raises(KeyError):
+            load_accounts(path)
+
+    def test_run_polls_every_account(self, monkeypatch):
+        import engine
+
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: MockResponse()
+        )
+        monkeypatch.setattr(engine, 'next_delay', lambda *args: 0.01)
+        monkeypatch.setattr(engine, 'POLL_TICK', 0.01)
+        bot = MockBot()
+        accounts = [
+            Account(name='first', token='token1', chat_id='1'),
+            Account(name='second', token='token2', chat_id='2'),
+        ]
+
+        async def run_briefly():
+            task = asyncio.create_task(engine.run(accounts, bot))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(run_briefly())
+
+        assert sorted(chat_id for chat_id, _ in bot.sent) == ['1', '2'], (
+            'Каждый аккаунт должен получить ровно одно сообщение '
+            'о неизменившемся статусе'
+        )
+
+    def test_signals(self, monkeypatch):
+        import engine
+
+        requests_made = []
+
+        def mock_get(session, *args, **kwargs):
+            requests_made.append(kwargs['params'])
+            return MockResponse()
+
+        monkeypatch.setattr(requests.Session, 'get', mock_get)
+        monkeypatch.setattr(engine, 'next_delay', lambda *args: 600)
+        accounts = [Account(name='first', token='token1', chat_id='1')]
+
+        async def run_and_signal():
+            task = asyncio.create_task(
+                engine.run(accounts, MockBot(), handle_signals=True)
+            )
+            await asyncio.sleep(0.05)
+            os.kill(os.getpid(), signal.SIGUSR1)
+            await asyncio.sleep(0.05)
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(task, timeout=2)
+
+        asyncio.run(run_and_signal())
+
+        assert len(requests_made) == 1, (
+            'SIGUSR1 должен опрашивать сразу, SIGTERM — останавливать опрос'
+        )
+
+    def test_outbox_is_replayed_and_acknowledged(self, monkeypatch):
+        import engine
+        from storage import StateStore
+
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: MockResponse()
+        )
+        monkeypatch.setattr(engine, 'next_delay', lambda *args: 600)
+        store = StateStore(':memory:')
+        store.save('first', messages=[('1', 'не доставлено до падения')])
+        bot = MockBot()
+        accounts = [Account(name='first', token='token1', chat_id='1')]
+
+        async def run_briefly():
+            task = asyncio.create_task(engine.run(accounts, bot, store))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        asyncio.run(run_briefly())
+
+        assert 'не доставлено до падения' in bot.sent[0][1], (
+            'Уведомления из outbox должны отправляться при запуске'
+        )
+        assert store.pending_messages(['first']) == [], (
+            'Доставленные уведомления должны удаляться из outbox'
+        )
+
+    def test_bad_homework_does_not_block_others(self, monkeypatch):
+        from engine import AccountPoller, Context
+        from storage import StateStore
+
+        class Response:
+            status_code = 200
+
+            def json(self):
+                return {
+                    'homeworks': [
+                        {'id': 1, 'status': 'new_status'},
+                        {'id': 2, 'homework_name': 'hw2',
+                         'status': 'approved'},
+                    ],
+                    'current_date': 1000198000,
+                }
+
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: Response()
+        )
+        store = StateStore(':memory:')
+
+        async def steps():
+            context = Context(
+                queue=MockQueue(), semaphore=asyncio.Semaphore(1)
+            )
+            account = Account(name='first', token='token', chat_id='1')
+            poller = AccountPoller(account, context, store, 1)
+            for _ in range(3):
+                await poller.step()
+            return context.queue.messages
+
+        messages = asyncio.run(steps())
+
+        assert len(messages) == 2, (
+            'Ошибка в одной работе должна сообщаться один раз, '
+            'а остальные работы — обрабатываться'
+        )
+        assert any('hw2' in message for message in messages)
+        assert store.load('first') == (
+            1000198000, {'1': 'new_status', '2': 'approved'}
+        ), 'Курсор должен сдвигаться, несмотря на ошибку в одной работе'
+
+    def test_outbox_is_replayed_per_worker(self, monkeypatch, tmp_path):
+        import engine
+        from storage import StateStore
+
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: MockResponse()
+        )
+        monkeypatch.setattr(engine, 'next_delay', lambda *args: 600)
+        path = tmp_path / 'state.sqlite3'
+        store = StateStore(path)
+        store.save('first', messages=[('1', 'уведомление первого')])
+        store.save('second', messages=[('2', 'уведомление второго')])
+        store.close()
+        workers = {
+            'first': Account(name='first', token='token1', chat_id='1'),
+            'second': Account(name='second', token='token2', chat_id='2'),
+        }
+        sent = {}
+
+        async def run_worker(name):
+            bot = MockBot()
+            store = StateStore(path)
+            task = asyncio.create_task(
+                engine.run([workers[name]], bot, store)
+            )
+            await asyncio.sleep(0.1)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            store.close()
+            sent[name] = ' '.join(text for _, text in bot.sent)
+
+        async def run_workers():
+            await asyncio.gather(run_worker('first'), run_worker('second'))
+
+        asyncio.run(run_workers())
+
+        assert 'уведомление первого' in sent['first']
+        assert 'уведомление второго' not in sent['first'], (
+            'Процесс должен повторять только уведомления своих аккаунтов'
+        )
+        assert 'уведомление второго' in sent['second']
+        assert 'уведомление первого' not in sent['second']
+
+    def test_client_errors_do_not_open_api_breaker(self, monkeypatch):
+        from breaker import CLOSED, OPEN
+        from engine import Context, request_guarded
+        from exceptions import UnexpectedStatusError
+
+        async def guarded(status_code):
+            async def fetch(context, account, current_timestamp):
+                raise UnexpectedStatusError('Ошибка', status_code)
+
+            monkeypatch.setattr(Context, 'fetch', fetch)
+            context = Context(queue=None, semaphore=asyncio.Semaphore(1))
+            for number in range(5):
+                account = Account(
+                    name=str(number), token=f'token{number}', chat_id='1'
+                )
+                with pytest.raises(UnexpectedStatusError):
+                    await request_guarded(account, context, 0)
+            return context
+
+        context = asyncio.run(guarded(401))
+        assert context.api_breaker.state == CLOSED, (
+            'Отозванные токены не должны размыкать общий предохранитель'
+        )
+        assert context.breakers['0'].failures == 1
+
+        context = asyncio.run(guarded(502))
+        assert context.api_breaker.state == OPEN
+
+    def test_startup_polls_are_spread(self, monkeypatch):
+        import engine
+        from engine import AccountPoller, Context, Dispatcher
+        from storage import StateStore
+
+        now = [1000]
+        polled = []
+
+        def mock_get(session, *args, **kwargs):
+            polled.append(now[0])
+            return MockResponse()
+
+        monkeypatch.setattr(requests.Session, 'get', mock_get)
+        monkeypatch.setattr(engine, 'next_delay', lambda *args: 600)
+
+        async def run_dispatcher():
+            context = Context(
+                queue=MockQueue(), semaphore=asyncio.Semaphore(10),
+                clock=lambda: now[0]
+            )
+            store = StateStore(':memory:')
+            pollers = [
+                AccountPoller(
+                    Account(
+                        name=f'student{number}', token=f'token{number}',
+                        chat_id=str(number)
+                    ), context, store
+                )
+                for number in range(20)
+            ]
+            task = asyncio.create_task(
+                Dispatcher(pollers, context, tick=0.001).run()
+            )
+            await asyncio.sleep(0.02)
+            assert polled == [], 'При запуске аккаунты не опрашиваются разом'
+            while now[0] < 1600:
+                now[0] += 30
+                await asyncio.sleep(0.02)
+            context.stop.set()
+            await task
+
+        asyncio.run(run_dispatcher())
+
+        assert len(polled) == 20, (
+            'Каждый аккаунт должен быть опрошен за первый интервал'
+        )
+        assert len(set(polled)) > 10, (
+            'Первые опросы должны распределяться по интервалу'
+        )
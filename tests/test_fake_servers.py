@@ -0,0 +1,67 @@
+import pytest
+
+import http_session
+from bot_api import BotApiClient
+from exceptions import NoResponseError, RetryAfterError
+from fake_servers import (FakePracticumServer, FakeTelegramServer,
+                          latency_sampler)
+
+
+class TestFakeServers:
+
+    def test_practicum(self, monkeypatch):
+        import homework
+
+        server = FakePracticumServer(homeworks=50).start()
+        monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+        try:
+            response = homework.request_api({'Authorization': 'OAuth t'}, 1)
+            homeworks = homework.check_response(response)
+            fresh = homework.request_api(
+                {'Authorization': 'OAuth t'}, response['current_date'] + 1
+            )
+        finally:
+            server.stop()
+
+        assert len(homeworks) == 50
+        assert all(homework.parse_status(item) for item in homeworks)
+        assert fresh['homeworks'] == []
+
+    def test_practicum_failures(self, monkeypatch):
+        import homework
+
+        server = FakePracticumServer(error_rate=1).start()
+        monkeypatch.setattr(homework, 'ENDPOINT', server.endpoint)
+        try:
+            with pytest.raises(NoResponseError):
+                homework.get_api_answer(1)
+        finally:
+            server.stop()
+
+        assert server.errors == 1
+
+    def test_telegram(self):
+        server = FakeTelegramServer().start()
+        throttled = FakeTelegramServer(rate_limit_rate=1, retry_after=3)
+        throttled.start()
+        try:
+            BotApiClient('1234:abcdefg', url=server.url).send_message(
+                12345, 'text'
+            )
+            with pytest.raises(RetryAfterError) as error:
+                BotApiClient('1234:abcdefg', url=throttled.url).send_message(
+                    12345, 'text'
+                )
+        finally:
+            server.stop()
+            throttled.stop()
+            http_session.close_session()
+
+        assert server.messages == [('12345', 'text')]
+        assert error.value.retry_after == 3
+
+    def test_latency_sampler(self):
+        assert latency_sampler(0.5)() == 0.5
+        assert 0.1 <= latency_sampler('uniform:0.1,0.2')() <= 0.2
+        with pytest.raises(ValueError):
+            latency_sampler('gamma:1')
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from exceptions import NoResponseError
+from hedging import Hedger, attempt_timeout
+from metrics import API_HEDGES
+
+
+def warmed_hedger(**kwargs):
+    hedger = Hedger(hedge=True, min_samples=5, **kwargs)
+    for _ in range(5):
+        hedger.latencies.observe(0.01)
+    return hedger
+
+
+class TestHedging:
+
+    def test_no_hedge_without_samples(self):
+        hedger = Hedger(hedge=True, min_samples=5)
+        calls = []
+
+        assert hedger.call(lambda remaining: calls.append(remaining)) is None
+        assert len(calls) == 1, (
+            'Без наблюдений дублирующая попытка не должна запускаться'
+        )
+        assert calls[0] <= hedger.deadline
+
+    def test_hedge_wins_over_slow_attempt(self):
+        hedger = warmed_hedger()
+        calls = []
+        fired = API_HEDGES.value(result='fired')
+        won = API_HEDGES.value(result='won')
+
+        def attempt(remaining):
+            calls.append(remaining)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return 'slow'
+            return 'fast'
+
+        started = time.monotonic()
+        assert hedger.call(attempt) == 'fast', (
+            'Должен возвращаться первый успешный ответ'
+        )
+        assert time.monotonic() - started < 0.4
+        assert API_HEDGES.value(result='fired') == fired + 1
+        assert API_HEDGES.value(result='won') == won + 1
+
+    def test_hedge_needs_budget(self):
+        hedger = warmed_hedger()
+        calls = []
+        throttled = API_HEDGES.value(result='throttled')
+
+        def attempt(remaining):
+            calls.append(remaining)
+            time.sleep(0.1)
+            return 'slow'
+
+        assert hedger.call(attempt, admit=lambda: False) == 'slow'
+        assert len(calls) == 1, (
+            'Без бюджета запросов дублирующая попытка не запускается'
+        )
+        assert API_HEDGES.value(result='throttled') == throttled + 1
+
+    def test_error_falls_back_to_other_attempt(self):
+        hedger = warmed_hedger()
+        calls = []
+
+        def attempt(remaining):
+            calls.append(remaining)
+            if len(calls) == 1:
+                time.sleep(0.05)
+                raise NoResponseError('first')
+            time.sleep(0.1)
+            return 'second'
+
+        assert hedger.call(attempt) == 'second'
+
+    def test_deadline(self):
+        hedger = warmed_hedger(deadline=0.1)
+
+        def attempt(remaining):
+            time.sleep(0.3)
+
+        started = time.monotonic()
+        with pytest.raises(NoResponseError):
+            hedger.call(attempt)
+        assert time.monotonic() - started < 0.25, (
+            'Ответ не должен ждаться дольше общего срока'
+        )
+
+    def test_attempt_timeout(self):
+        assert attempt_timeout(2) == (2, 2)
+        assert attempt_timeout(1000)[1] < 1000
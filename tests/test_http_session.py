@@ -0,0 +1,40 @@
+import pytest
+import requests
+
+import http_session
+from exceptions import NoResponseError
+
+
+class TestHttpSession:
+
+    def test_session_is_shared(self):
+        http_session.close_session()
+        session = http_session.get_session()
+
+        assert http_session.get_session() is session, (
+            'Сессия должна переиспользоваться между запросами'
+        )
+        adapter = session.get_adapter('https://practicum.yandex.ru/')
+        assert adapter._pool_maxsize == http_session.POOL_MAXSIZE
+        assert adapter._pool_block
+
+        http_session.close_session()
+        assert http_session.get_session() is not session
+
+    def test_request_api_uses_timeout(self, monkeypatch):
+        import homework
+
+        calls = []
+
+        def mock_get(session, url, **kwargs):
+            calls.append(kwargs)
+            raise requests.Timeout('read timeout')
+
+        monkeypatch.setattr(requests.Session, 'get', mock_get)
+
+        with pytest.raises(NoResponseError):
+            homework.get_api_answer(1000198000)
+
+        assert calls[0]['timeout'] == http_session.TIMEOUT, (
+            'Запрос к API-сервису должен выполняться с таймаутом'
+        )
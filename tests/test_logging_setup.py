@@ -0,0 +1,92 @@
+import io
+import json
+import logging
+
+from logging_setup import (JsonFormatter, SamplingFilter, configure_logging,
+                           stop_logging)
+
+
+def make_record(message, level=logging.DEBUG, args=()):
+    return logging.LogRecord(
+        'engine', level, __file__, 1, message, args, None, 'poll'
+    )
+
+
+class TestLoggingSetup:
+
+    def test_sampling_filter(self):
+        sampler = SamplingFilter(every=10)
+
+        passed = [
+            sampler.filter(make_record('[%s] Статус работы не изменился'))
+            for _ in range(25)
+        ]
+
+        assert passed.count(True) == 3, (
+            'Из повторяющихся debug-записей должна выводиться каждая 10-я'
+        )
+        assert all(
+            sampler.filter(make_record('Сбой', logging.ERROR))
+            for _ in range(5)
+        ), 'Записи выше уровня выборки должны проходить всегда'
+
+    def test_json_formatter(self):
+        line = JsonFormatter().format(
+            make_record('[%s] запрос', logging.INFO, ('first',))
+        )
+
+        data = json.loads(line)
+        assert data['message'] == '[first] запрос'
+        assert data['level'] == 'INFO'
+        assert data['function'] == 'poll'
+
+    def test_records_are_written_by_listener(self):
+        stream = io.StringIO()
+        root_logger = logging.getLogger()
+        level = root_logger.level
+        configure_logging('INFO', json_output=True, stream=stream)
+        try:
+            logging.getLogger('engine').info('Запуск опроса: %s', 2)
+        finally:
+            stop_logging()
+            root_logger.setLevel(level)
+
+        assert json.loads(stream.getvalue())['message'] == 'Запуск опроса: 2', (
+            'После остановки очередь логов должна быть дописана в поток'
+        )
+
+    def test_exception_is_a_separate_field(self):
+        stream = io.StringIO()
+        root_logger = logging.getLogger()
+        level = root_logger.level
+        configure_logging('INFO', json_output=True, stream=stream)
+        try:
+            try:
+                raise ValueError('сломалось')
+            except ValueError:
+                logging.getLogger('engine').exception('Сбой опроса')
+        finally:
+            stop_logging()
+            root_logger.setLevel(level)
+
+        data = json.loads(stream.getvalue())
+        assert data['message'] == 'Сбой опроса', (
+            'Трассировка не должна попадать в текст сообщения'
+        )
+        assert 'ValueError: сломалось' in data['exception']
+
+    def test_text_output_keeps_traceback(self):
+        stream = io.StringIO()
+        root_logger = logging.getLogger()
+        level = root_logger.level
+        configure_logging('INFO', json_output=False, stream=stream)
+        try:
+            try:
+                raise ValueError('сломалось')
+            except ValueError:
+                logging.getLogger('engine').exception('Сбой опроса')
+        finally:
+            stop_logging()
+            root_logger.setLevel(level)
+
+        assert 'Сбой опроса\nTraceback' in stream.getvalue()
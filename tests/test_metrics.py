@@ -0,0 +1,36 @@
+import requests
+
+import metrics
+
+
+class TestMetrics:
+
+    def test_render(self):
+        errors = metrics.Counter(
+            'test_errors_total', 'Ошибки', ('type',)
+        )
+        latency = metrics.Histogram(
+            'test_latency_seconds', 'Задержка', buckets=(0.1, 1)
+        )
+        errors.inc(type='NoResponseError')
+        errors.inc(type='NoResponseError')
+        latency.observe(0.05)
+        latency.observe(5)
+
+        text = metrics.render()
+
+        assert 'test_errors_total{type="NoResponseError"} 2' in text
+        assert 'test_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{le="1"} 1' in text
+        assert 'test_latency_seconds_bucket{le="+Inf"} 2' in text
+        assert 'test_latency_seconds_count 2' in text
+
+    def test_server(self):
+        server = metrics.start_server(0, host='127.0.0.1')
+        port = server.server_address[1]
+
+        response = requests.get(f'http://127.0.0.1:{port}/metrics')
+        server.shutdown()
+
+        assert response.status_code == 200
+        assert '# TYPE homework_api_request_seconds histogram' in response.text
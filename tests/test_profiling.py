@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+import profiling
+
+
+class TestProfiling:
+
+    def test_span_writes_jsonl(self, tmp_path):
+        path = tmp_path / 'trace.jsonl'
+        profiling.enable_tracing(path)
+        try:
+            with profiling.span('parse_status', account='student'):
+                pass
+            with pytest.raises(KeyError):
+                with profiling.span('check_response'):
+                    raise KeyError('homeworks')
+        finally:
+            profiling.disable_tracing()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+
+        assert [record['span'] for record in records] == [
+            'parse_status', 'check_response'
+        ]
+        assert records[0]['account'] == 'student'
+        assert records[0]['duration'] >= 0
+        assert records[1]['error'] == 'KeyError'
+
+    def test_span_disabled(self):
+        with profiling.span('parse_status'):
+            pass
+
+    def test_toggle_profiling(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+
+        profiling.toggle_profiling()
+        sum(range(1000))
+        profiling.toggle_profiling()
+
+        names = sorted(path.suffix for path in tmp_path.iterdir())
+        assert names == ['.prof', '.txt']
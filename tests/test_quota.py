@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+import requests
+
+from accounts import Account
+from exceptions import RateLimitedError, ThrottledError
+from quota import QuotaManager
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000
+
+    def __call__(self):
+        return self.now
+
+
+class MockResponse:
+    status_code = 429
+    headers = {'Retry-After': '30'}
+
+
+class TestQuota:
+
+    def test_token_and_global_budgets(self):
+        clock = Clock()
+        quota = QuotaManager(budget=3, token_budget=2, window=60, clock=clock)
+
+        quota.acquire('first')
+        quota.acquire('first')
+        with pytest.raises(ThrottledError) as error:
+            quota.acquire('first')
+        assert error.value.scope == 'token'
+
+        quota.acquire('second')
+        with pytest.raises(ThrottledError) as error:
+            quota.acquire('third')
+        assert error.value.scope == 'global', (
+            'Общий бюджет должен ограничивать все токены вместе'
+        )
+
+        clock.now += 30
+        quota.acquire('first')
+
+    def test_retry_after_pauses_requests(self):
+        clock = Clock()
+        quota = QuotaManager(budget=0, token_budget=0, clock=clock)
+
+        quota.throttle('first', 30)
+
+        assert quota.retry_in('second') == (30, 'global'), (
+            'Ответ 429 должен приостанавливать все запросы с этого IP'
+        )
+        clock.now += 30
+        quota.acquire('second')
+
+    def test_pause_is_shared_between_processes(self, tmp_path):
+        from storage import StateStore
+
+        clock = Clock()
+        path = tmp_path / 'state.sqlite3'
+        first, second = StateStore(path), StateStore(path)
+        quota = QuotaManager(budget=0, token_budget=0, clock=clock,
+                             store=first)
+        other = QuotaManager(budget=0, token_budget=0, clock=clock,
+                             store=second)
+
+        quota.throttle('first', 30)
+
+        assert other.retry_in('second') == (30, 'global'), (
+            'Пауза после 429 должна действовать на все процессы'
+        )
+
+        token = QuotaManager(budget=0, token_budget=0, clock=clock,
+                             scope='token', store=first)
+        token.throttle('first', 60)
+        assert other.retry_in('first') == (60, 'token')
+        assert other.retry_in('second') == (30, 'global')
+        scopes = [
+            scope for scope, in first.connection.execute(
+                'SELECT scope FROM pauses'
+            )
+        ]
+        assert all('first' not in scope for scope in scopes), (
+            'Токен не должен храниться в базе открытым текстом'
+        )
+
+    def test_request_api_raises_rate_limited(self, monkeypatch):
+        from homework import request_api
+
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: MockResponse()
+        )
+
+        with pytest.raises(RateLimitedError) as error:
+            request_api({'Authorization': 'OAuth token'}, 1)
+        assert error.value.retry_after == 30
+
+    def test_rate_limited_poll_is_deferred(self, monkeypatch):
+        from engine import AccountPoller, Context
+        from metrics import API_THROTTLED
+        from storage import StateStore
+
+        class Queue:
+
+            def __init__(self):
+                self.messages = []
+
+            def put(self, chat_id, message, outbox_id=None):
+                self.messages.append(message)
+
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: MockResponse()
+        )
+        deferred = API_THROTTLED.value(scope='global', action='deferred')
+
+        async def step():
+            context = Context(queue=Queue(), semaphore=asyncio.Semaphore(1))
+            account = Account(name='first', token='token', chat_id='1')
+            poller = AccountPoller(account, context, StateStore(':memory:'))
+            await poller.step()
+            return context, poller
+
+        context, poller = asyncio.run(step())
+
+        assert context.queue.messages == [], (
+            'Ответ 429 не должен сообщаться в чат как сбой'
+        )
+        assert poller.failures == 0
+        assert 29 < poller.resume_at - context.clock() <= 30
+        assert API_THROTTLED.value(
+            scope='global', action='deferred'
+        ) == deferred + 1
@@ -0,0 +1,75 @@
+import asyncio
+import itertools
+import os
+import signal
+
+import requests
+
+import recorder
+from accounts import Account
+from replay import load_events, replay
+
+STATUSES = ['reviewing', 'reviewing', None, 'rejected', 'approved']
+
+
+class MockResponse:
+
+    def __init__(self, status):
+        self.status = status
+        self.status_code = 200 if status else 500
+
+    def json(self):
+        return {
+            'homeworks': [{'homework_name': 'hw123', 'status': self.status}],
+            'current_date': 1000198000,
+        }
+
+
+class MockBot:
+
+    def send_message(self, chat_id, text):
+        pass
+
+
+class TestReplay:
+
+    def test_replay_matches_recording(self, monkeypatch, tmp_path):
+        import engine
+
+        statuses = itertools.cycle(STATUSES)
+        monkeypatch.setattr(
+            requests.Session, 'get',
+            lambda session, *args, **kwargs: MockResponse(next(statuses))
+        )
+        monkeypatch.setattr(engine, 'next_delay', lambda *args: 0.01)
+        monkeypatch.setattr(engine, 'POLL_TICK', 0.01)
+        accounts = [
+            Account(name='first', token='token1', chat_id='1'),
+            Account(name='second', token='token2', chat_id='2'),
+        ]
+        path = tmp_path / 'traffic.jsonl'
+
+        async def run_briefly():
+            task = asyncio.create_task(
+                engine.run(accounts, MockBot(), handle_signals=True)
+            )
+            await asyncio.sleep(0.2)
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(task, timeout=2)
+
+        recorder.enable_recording(path)
+        try:
+            asyncio.run(run_briefly())
+        finally:
+            recorder.disable_recording()
+
+        events = load_events(path)
+        result = asyncio.run(replay(events))
+
+        assert result.iterations == sum(
+            event['event'] in ('response', 'error') for event in events
+        )
+        assert result.recorded, 'Запись должна содержать отправки'
+        assert result.mismatches() == 0, (
+            'Воспроизведение должно давать те же сообщения, что и запись'
+        )
@@ -0,0 +1,71 @@
+import scheduler
+from scheduler import TimingWheel, first_poll, next_poll
+
+
+class TestScheduler:
+
+    def test_reviewing_is_polled_more_often(self):
+        assert (
+            scheduler.next_delay('reviewing')
+            < scheduler.next_delay('rejected')
+            < scheduler.next_delay('approved')
+        )
+        assert scheduler.next_delay() == scheduler.IDLE_DELAY
+
+    def test_backoff_is_bounded(self):
+        delays = [
+            scheduler.next_delay('reviewing', failures)
+            for failures in range(30)
+        ]
+
+        assert delays == sorted(delays), (
+            'Пауза должна расти с числом неудачных запросов'
+        )
+        assert delays[-1] == scheduler.MAX_DELAY
+
+    def test_phases_are_stable_and_spread(self):
+        interval = 600
+        polls = [
+            next_poll(f'student{number}', interval, 1000)
+            for number in range(100)
+        ]
+
+        assert all(1300 <= poll <= 1900 for poll in polls)
+        assert len({int(poll % interval // 60) for poll in polls}) == 10, (
+            'Аккаунты должны равномерно распределяться по интервалу'
+        )
+        first = next_poll('student', interval, 1000)
+        assert next_poll('student', interval, first + 1) == first + interval, (
+            'Опросы аккаунта должны идти в постоянной фазе'
+        )
+
+    def test_first_poll_is_within_interval(self):
+        interval = 600
+        polls = [
+            first_poll(f'student{number}', interval, 1000)
+            for number in range(100)
+        ]
+
+        assert all(1000 <= poll < 1600 for poll in polls)
+        assert len({int((poll - 1000) // 60) for poll in polls}) == 10, (
+            'Первые опросы должны распределяться по интервалу'
+        )
+        assert first_poll('student', interval, 1000) == next_poll(
+            'student', interval, 700
+        ), 'Первый опрос должен идти в фазе аккаунта'
+
+    def test_timing_wheel(self):
+        wheel = TimingWheel(tick=1, slots=8)
+        wheel.schedule('soon', 3)
+        wheel.schedule('later', 20)
+        wheel.schedule('cancelled', 2)
+        wheel.cancel('cancelled')
+
+        assert wheel.advance(2) == []
+        assert wheel.advance(5) == ['soon']
+        assert len(wheel) == 1
+        assert wheel.advance(12) == [], (
+            'Таймер через несколько оборотов не должен срабатывать раньше'
+        )
+        assert wheel.advance(100) == ['later']
+        assert len(wheel) == 0
@@ -0,0 +1,158 @@
+import threading
+
+import sender
+from breaker import CLOSED, OPEN
+from exceptions import TelegramApiError
+from sender import MessageQueue, TokenBucket
+
+
+class RetryAfter(Exception):
+
+    def __init__(self, retry_after):
+        super().__init__(f'Flood control, retry in {retry_after}')
+        self.retry_after = retry_after
+
+
+class MockBot:
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.blocked = set()
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send_message(self, chat_id, text):
+        with self.lock:
+            if chat_id in self.blocked:
+                raise TelegramApiError('Forbidden: bot was blocked', 403)
+            if self.failures:
+                raise self.failures.pop(0)
+            self.sent.append((chat_id, text))
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSender:
+
+    def test_token_bucket(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+        assert bucket.take() and bucket.take()
+        assert not bucket.take()
+        assert bucket.delay() == 0.5
+
+        clock.now = 0.5
+        assert bucket.take()
+
+    def test_messages_are_coalesced_per_chat(self):
+        bot = MockBot()
+        queue = MessageQueue(bot, window=0.2, workers=2).start()
+        queue.put('1', 'first')
+        queue.put('2', 'other')
+        queue.put('1', 'second')
+
+        assert queue.close(timeout=2) == 0
+        assert sorted(bot.sent) == [('1', 'first\n\nsecond'), ('2', 'other')]
+
+    def test_retry_after(self):
+        bot = MockBot(failures=[RetryAfter(0.1)])
+        queue = MessageQueue(bot, window=0, workers=1).start()
+        queue.put('1', 'first')
+        queue.put('1', 'second')
+
+        assert queue.close(timeout=2) == 0
+        assert bot.sent == [('1', 'first\n\nsecond')], (
+            'После 429 сообщения должны быть отправлены повторно по порядку'
+        )
+
+    def test_chat_error_does_not_open_telegram_breaker(self, monkeypatch):
+        monkeypatch.setattr(sender, 'RETRY_DELAY', 0.01)
+        bot = MockBot()
+        bot.blocked = {'1', '2', '3', '4', '5'}
+        queue = MessageQueue(bot, chat_rate=100, window=0, workers=2).start()
+        for chat_id in bot.blocked:
+            queue.put(chat_id, 'blocked')
+        queue.put('6', 'ok')
+
+        assert queue.close(timeout=2) == 0
+        assert bot.sent == [('6', 'ok')]
+        assert queue.breaker.state == CLOSED, (
+            'Ошибки 403 отдельных чатов не должны размыкать '
+            'предохранитель telegram'
+        )
+
+    def test_server_errors_open_telegram_breaker(self):
+        bot = MockBot(failures=[
+            TelegramApiError('Internal Server Error', 500)
+            for _ in range(5)
+        ])
+        queue = MessageQueue(bot, window=0, workers=1).start()
+        for chat_id in '12345':
+            queue.put(chat_id, 'message')
+        queue.close(timeout=0.5)
+
+        assert queue.breaker.state == OPEN
+
+    def test_retry_is_delayed(self, monkeypatch):
+        monkeypatch.setattr(sender, 'RETRY_DELAY', 10)
+        clock = FakeClock()
+        bot = MockBot(failures=[TelegramApiError('Bad Gateway', 502)])
+        queue = MessageQueue(bot, window=0, clock=clock)
+        queue.put('1', 'first')
+
+        batch, _ = queue._next_batch()
+        queue._send(*batch)
+        queue.in_flight.discard('1')
+        batch, wait = queue._next_batch()
+        assert batch is None and wait == 10, (
+            'Повтор отправки должен ждать паузу RETRY_DELAY'
+        )
+
+        clock.now = 10
+        batch, _ = queue._next_batch()
+        queue._send(*batch)
+        assert bot.sent == [('1', 'first')]
+
+    def test_undeliverable_messages_leave_outbox(self, monkeypatch):
+        from storage import StateStore
+
+        monkeypatch.setattr(sender, 'RETRY_DELAY', 0)
+        store = StateStore(':memory:')
+        blocked, failing = store.save(
+            'student', messages=[('1', 'blocked'), ('2', 'failing')]
+        )
+        bot = MockBot(failures=[
+            TelegramApiError('Internal Server Error', 500)
+            for _ in range(sender.MAX_ATTEMPTS)
+        ])
+        bot.blocked = {'1'}
+        queue = MessageQueue(
+            bot, chat_rate=100, window=0, workers=1, outbox=store
+        ).start()
+        queue.put('2', 'failing', failing)
+        queue.close(timeout=2)
+        queue = MessageQueue(
+            bot, chat_rate=100, window=0, workers=1, outbox=store
+        ).start()
+        queue.put('1', 'blocked', blocked)
+        queue.close(timeout=2)
+
+        assert bot.sent == []
+        assert store.pending_messages(['student']) == [], (
+            'Недоставляемые уведомления не должны повторяться при запуске'
+        )
+        dead = store.connection.execute(
+            'SELECT id, chat_id, error FROM dead_letters ORDER BY id'
+        ).fetchall()
+        assert [(row[0], row[1]) for row in dead] == [
+            (blocked, '1'), (failing, '2')
+        ]
+        assert 'Forbidden' in dead[0][2]
@@ -0,0 +1,49 @@
+from state import Status, StatusTable, intern_status
+
+
+class TestStatusTable:
+
+    def test_changes_only_transitions(self):
+        table = StatusTable({'1': 'reviewing', '2': 'approved'})
+        homeworks = [
+            {'id': 1, 'homework_name': 'hw1', 'status': 'approved'},
+            {'id': 2, 'homework_name': 'hw2', 'status': 'approved'},
+            {'id': 3, 'homework_name': 'hw3', 'status': 'reviewing'},
+        ]
+
+        changed = table.changes(homeworks)
+
+        assert [homework['id'] for homework in changed] == [1, 3], (
+            'Должны возвращаться только работы с изменившимся статусом'
+        )
+
+    def test_apply(self):
+        table = StatusTable()
+        homework = {'homework_name': 'hw1', 'status': 'reviewing'}
+
+        assert table.changes([homework]) == [homework]
+        table.apply(homework)
+
+        assert table.changes([homework]) == []
+        assert table.current_status() == 'reviewing'
+
+    def test_duplicates_and_invalid_entries(self):
+        table = StatusTable()
+        homework = {'homework_name': 'hw1', 'status': 'reviewing'}
+        invalid = {'status': 'approved'}
+
+        changed = table.changes([homework, dict(homework), invalid])
+
+        assert changed == [homework, invalid]
+
+    def test_statuses_are_interned(self):
+        loaded = {'1': ''.join(['review', 'ing']), '2': 'unknown_' + 'status'}
+        table = StatusTable(loaded)
+        table.apply({'id': 3, 'status': ''.join(['review', 'ing'])})
+
+        assert table.statuses['1'] is table.statuses['3'] is Status.REVIEWING
+        assert table.statuses['1'] == 'reviewing'
+        assert table.statuses['2'] is intern_status('unknown_status'), (
+            'Неизвестные статусы тоже должны храниться одним объектом'
+        )
+        assert table.current_status() == 'reviewing'
@@ -0,0 +1,54 @@
+from storage import StateStore
+
+
+class TestStateStore:
+
+    def test_state_survives_restart(self, tmp_path):
+        path = tmp_path / 'state.sqlite3'
+        store = StateStore(path)
+        store.save('student', 1000198000, {'1': 'reviewing'})
+        store.save('student', 1000198991, {'1': 'approved', '2': 'rejected'})
+        store.close()
+
+        store = StateStore(path)
+        from_date, statuses = store.load('student')
+
+        assert from_date == 1000198991
+        assert statuses == {'1': 'approved', '2': 'rejected'}
+        assert store.load('other') == (None, {}), (
+            'Состояние аккаунтов не должно пересекаться'
+        )
+        store.close()
+
+    def test_outbox(self, tmp_path):
+        path = tmp_path / 'state.sqlite3'
+        store = StateStore(path)
+        ids = store.save(
+            'student', 1000198000, {'1': 'approved'},
+            messages=[('1', 'first'), ('1', 'second')]
+        )
+        store.mark_sent(ids[:1])
+        store.close()
+
+        store = StateStore(path)
+
+        assert store.pending_messages(['student']) == [
+            (ids[1], '1', 'second')
+        ], 'Неподтвержденные уведомления должны переживать перезапуск'
+        assert store.pending_messages(['other']) == []
+        store.mark_sent(ids)
+        assert store.pending_messages(['student']) == []
+        store.close()
+
+    def test_dead_letter(self):
+        store = StateStore(':memory:')
+        ids = store.save('student', messages=[('1', 'first'), ('1', 'next')])
+
+        store.dead_letter(ids[:1], 'Forbidden: bot was blocked')
+
+        assert store.pending_messages(['student']) == [(ids[1], '1', 'next')]
+        assert store.connection.execute(
+            'SELECT account, chat_id, message, error FROM dead_letters'
+        ).fetchall() == [
+            ('student', '1', 'first', 'Forbidden: bot was blocked')
+        ], 'Отброшенное уведомление должно сохраняться вместе с ошибкой'
@@ -0,0 +1,103 @@
+import json
+
+from accounts import Account
+from supervisor import HashRing, Supervisor, partition
+
+
+def make_accounts(count):
+    return [
+        Account(name=f'student{number}', token='token', chat_id=str(number))
+        for number in range(count)
+    ]
+
+
+class FakeProcess:
+
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.exitcode = None if alive else 1
+        self.name = 'fake'
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+class TestSupervisor:
+
+    def test_partition_is_stable(self):
+        accounts = make_accounts(200)
+        first = partition(accounts, 4)
+
+        assert first == partition(accounts, 4), (
+            'Распределение аккаунтов должно быть детерминированным'
+        )
+        assert sum(len(shard) for shard in first.values()) == 200
+        assert all(first.values()), 'Каждый процесс должен получить аккаунты'
+
+    def test_adding_worker_moves_few_accounts(self):
+        keys = [account.name for account in make_accounts(1000)]
+        before = HashRing(range(4))
+        after = HashRing(range(5))
+
+        moved = [key for key in keys if before.node(key) != after.node(key)]
+
+        assert all(after.node(key) == 4 for key in moved), (
+            'Аккаунты должны переезжать только на новый процесс'
+        )
+        assert len(moved) < 350, (
+            'При добавлении процесса должна переезжать малая доля аккаунтов'
+        )
+
+    def test_rebalance_restarts_only_changed_shards(self, tmp_path,
+                                                    monkeypatch):
+        path = tmp_path / 'accounts.json'
+        supervisor = Supervisor(path, workers=4)
+        spawned = []
+
+        def spawn(worker):
+            spawned.append(worker)
+            supervisor.processes[worker] = FakeProcess()
+
+        monkeypatch.setattr(supervisor, 'spawn', spawn)
+        accounts = make_accounts(40)
+        supervisor.rebalance(accounts)
+        assert sorted(spawned) == [0, 1, 2, 3]
+
+        spawned.clear()
+        added = Account(name='newcomer', token='token', chat_id='100')
+        supervisor.rebalance(accounts + [added])
+
+        assert spawned == [HashRing(range(4)).node('newcomer')], (
+            'Перезапускаться должен только процесс нового аккаунта'
+        )
+
+    def test_check_restarts_crashed_worker(self, tmp_path, monkeypatch):
+        path = tmp_path / 'accounts.json'
+        path.write_text(json.dumps([
+            {'name': 'first', 'practicum_token': 'token', 'chat_id': 1},
+        ]))
+        supervisor = Supervisor(path, workers=1)
+        spawned = []
+
+        def spawn(worker):
+            spawned.append(worker)
+            supervisor.processes[worker] = FakeProcess()
+
+        monkeypatch.setattr(supervisor, 'spawn', spawn)
+        supervisor.rebalance(supervisor.load())
+        assert supervisor.load() is None, (
+            'Неизменившийся файл аккаунтов не должен перечитываться'
+        )
+        supervisor.processes[0] = FakeProcess(alive=False)
+        monkeypatch.setattr('supervisor.MAX_RESTART_DELAY', 0)
+
+        supervisor.check()
+        supervisor.check()
+
+        assert spawned == [0, 0], 'Упавший процесс должен перезапускаться'
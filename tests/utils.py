@@ -37,3 +37,10 @@ def check_default_var_exists(scope: ModuleType, var_name: str) -> None:
         f'{var_name} должна быть переменной, а не функцией.'
     )
 
+
+def session_get(mock_get):
+    """Wraps a `requests.get` mock to patch `requests.Session.get` with it"""
+    def get(session, *args, **kwargs):
+        return mock_get(*args, **kwargs)
+
+    return get